@@ -0,0 +1,135 @@
+"""Asyncio rest client for accessing the fibaro API."""
+from __future__ import annotations
+
+import base64
+import json as jsonlib
+import logging
+import weakref
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
+
+from .const import DEFAULT_TIMEOUT, HTTP_HEADERS
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncRestClient:
+    """Asyncio rest client for fibaro home center.
+
+    Requests share one aiohttp session, so many concurrent requests run on a
+    single event loop without a thread per call.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ssl_verify: bool,
+        username: str | None = None,
+        password: str | None = None,
+        session: ClientSession | None = None,
+        connection_limit: int = 100,
+    ) -> None:
+        """Init.
+
+        A session can be passed in to share it with the application. Such a
+        session is not closed by close(). Otherwise a session is created on
+        the first request with at most connection_limit open connections.
+        """
+        self._session = session
+        self._owns_session = session is None
+        self._connection_limit = connection_limit
+        self._ssl_verify = ssl_verify
+        self._auth_headers: dict[str, str] = {}
+
+        self._base_url = url
+        # push clients get the credentials of later set_auth() calls
+        self._push_clients: weakref.WeakSet[AsyncRestClient] = weakref.WeakSet()
+        if username and password:
+            self.set_auth(username, password)
+
+    def set_auth(self, username: str, password: str) -> None:
+        """Set the credentials for the fibaro home center."""
+        credentials = base64.b64encode(f"{username}:{password}".encode()).decode()
+        self._auth_headers = {"Authorization": f"Basic {credentials}"}
+        for push_client in self._push_clients:
+            push_client.set_auth(username, password)
+
+    def create_push_client(self) -> AsyncRestClient:
+        """Create a client with its own session and connection for the
+        refreshStates long-poll, so commands never wait behind it.
+        """
+        push_client = AsyncRestClient(
+            self._base_url, self._ssl_verify, connection_limit=1
+        )
+        push_client._auth_headers = self._auth_headers
+        self._push_clients.add(push_client)
+        return push_client
+
+    async def get(
+        self,
+        endpoint: str,
+        json: Any | None = None,
+        timeout: int | None = None,
+        http_headers: dict = None,
+    ) -> Any:
+        """Execute a get request."""
+        return await self._request("GET", endpoint, json, timeout, http_headers)
+
+    async def post(
+        self,
+        endpoint: str,
+        json: Any | None = None,
+        timeout: int | None = None,
+        http_headers: dict = None,
+    ) -> Any:
+        """Execute a post request."""
+        return await self._request("POST", endpoint, json, timeout, http_headers)
+
+    async def close(self) -> None:
+        """Close the session if it was created by this client."""
+        if self._session and self._owns_session:
+            await self._session.close()
+            self._session = None
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        json: Any | None,
+        timeout: int | None,
+        http_headers: dict | None,
+    ) -> Any:
+        current_timeout = timeout if timeout else DEFAULT_TIMEOUT
+        async with self._get_session().request(
+            method,
+            f"{self._base_url}{endpoint}",
+            json=json,
+            timeout=ClientTimeout(total=current_timeout),
+            headers={**HTTP_HEADERS, **self._auth_headers, **(http_headers or {})},
+            ssl=self._ssl_verify,
+        ) as response:
+            return await self._process_json_result(response)
+
+    def _get_session(self) -> ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = ClientSession(
+                connector=TCPConnector(limit=self._connection_limit),
+            )
+            self._owns_session = True
+        return self._session
+
+    async def _process_json_result(self, resp: ClientResponse) -> Any:
+        """Do error handling and logging on a HTTP response and covert to json."""
+        _LOGGER.debug('%s "%s": %s', resp.method, resp.url, resp.status)
+
+        resp.raise_for_status()
+
+        text = await resp.text()
+        try:
+            json = jsonlib.loads(text)
+            _LOGGER.debug("Response: %s", json)
+            return json
+        except ValueError:
+            _LOGGER.debug("No response")
+            return None
@@ -7,6 +7,25 @@ DEFAULT_TIMEOUT = 10
 # it waits up to 30 seconds before a response is sent
 REFRESH_STATE_TIMEOUT = 35
 
+# Timeout in seconds for reading the refreshStates cursor, the home center
+# answers at once because the cursor 0 is behind its current cursor
+STATE_CURSOR_TIMEOUT = 5
+
+# Max number of refreshStates responses waiting for the state change callback
+DEFAULT_DISPATCH_QUEUE_SIZE = 100
+
+# Max seconds stop waits for a running state change callback
+DISPATCH_STOP_TIMEOUT = 10
+
+# Max number of pooled connections used for commands and reads
+DEFAULT_POOL_SIZE = 10
+
+# Max number of actions sent in parallel to one home center by bulk requests
+DEFAULT_MAX_CONCURRENT_ACTIONS = 8
+
+# Minimum seconds between two saves of the state to the state store
+DEFAULT_STATE_SAVE_INTERVAL = 60
+
 # Constant http headers sent with each request
 HTTP_HEADERS = {
     "Content-Type": "application/json; charset=utf-8",
@@ -30,3 +49,9 @@ MANUFACTURER_NAME_MATCHER = {"HC2": "Fibaro", "HCL": "Fibaro",
 # Devices which are ignored
 # iOS_device includes iOS and Android devices
 IGNORE_DEVICE = ["HC_user", "VOIP_user", "iOS_device"]
+
+# Events of the refreshStates endpoint which indicate that the device
+# definition changed and the device needs to be read again
+DEVICE_CREATED_EVENT = "DeviceCreatedEvent"
+DEVICE_REMOVED_EVENT = "DeviceRemovedEvent"
+DEVICE_MODIFIED_EVENTS = ["DeviceModifiedEvent", "DeviceChangedRoomEvent"]
@@ -2,13 +2,15 @@
 from __future__ import annotations
 
 import logging
+import weakref
 from typing import Any
 
 from requests import Response, Session
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPBasicAuth
 from requests.exceptions import JSONDecodeError
 
-from .const import DEFAULT_TIMEOUT, HTTP_HEADERS
+from .const import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, HTTP_HEADERS
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -22,20 +24,48 @@ class RestClient:
         ssl_verify: bool,
         username: str | None = None,
         password: str | None = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
     ) -> None:
-        """Init"""
+        """Init
+
+        pool_size limits the number of pooled connections to the home center.
+        With keep_alive disabled, each request uses a new connection.
+        """
         self._session = Session()
-        self._session.headers = HTTP_HEADERS
+        self._session.headers = (
+            HTTP_HEADERS if keep_alive else {**HTTP_HEADERS, "Connection": "close"}
+        )
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
         if url.startswith("https"):
             self._session.verify = ssl_verify
 
         self._base_url = url
+        self._ssl_verify = ssl_verify
+        # push clients get the credentials of later set_auth() calls
+        self._push_clients: weakref.WeakSet[RestClient] = weakref.WeakSet()
         if username and password:
             self.set_auth(username, password)
 
     def set_auth(self, username: str, password: str) -> None:
         """Set the credentials for the fibaro home center."""
         self._session.auth = HTTPBasicAuth(username, password)
+        for push_client in self._push_clients:
+            push_client.set_auth(username, password)
+
+    def create_push_client(self) -> RestClient:
+        """Create a client with its own session and connection pool for the
+        refreshStates long-poll.
+
+        The push channel then never blocks a pooled connection needed for
+        commands and can be closed independently.
+        """
+        push_client = RestClient(self._base_url, self._ssl_verify, pool_size=1)
+        push_client._session.auth = self._session.auth
+        self._push_clients.add(push_client)
+        return push_client
 
     def get(
         self,
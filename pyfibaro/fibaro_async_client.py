@@ -0,0 +1,212 @@
+"""Asyncio client for accessing fibaro API."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from aiohttp import ClientResponseError, ClientSession
+
+from .common.async_rest_client import AsyncRestClient
+from .fibaro_async_state_handler import AsyncFibaroStateHandler
+from .fibaro_client import FibaroAuthenticationFailed, FibaroConnectFailed
+from .fibaro_device import DeviceModel
+from .fibaro_device_query import DeviceQuery
+from .fibaro_hub_data import FibaroHubData
+from .fibaro_info import InfoModel
+from .fibaro_login import LoginModel
+from .fibaro_room import RoomModel
+from .fibaro_scene import SceneModel
+
+
+class AsyncFibaroClient:
+    """Asyncio fibaro client.
+
+    Mirrors FibaroClient for applications running on an event loop. Models
+    returned by this client share its rest client, so action methods like
+    DeviceModel.execute_action() and SceneModel.start() return awaitables.
+
+    Usage:
+    Use set_authentication() to provide the credentials
+    Use await connect() to establish the connection and check the credentials
+    Use await close() to release the connections
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ssl_verify: bool = False,
+        session: ClientSession | None = None,
+        connection_limit: int = 100,
+    ) -> None:
+        """Init the async fibaro client.
+
+        The url needs to be in the format http(s)://<HOST>/api/.
+
+        An existing aiohttp session can be passed in to share its connection
+        pool, otherwise a session with connection_limit connections is created.
+        """
+        self._rest_client = AsyncRestClient(
+            url, ssl_verify, session=session, connection_limit=connection_limit
+        )
+        self._frontend_url = url.removesuffix("/api/")
+        self._api_version: int = None
+        self._state_handler: AsyncFibaroStateHandler = None
+
+    def set_authentication(self, username: str, password: str) -> None:
+        """Set the credentials."""
+        self._rest_client.set_auth(username, password)
+
+    async def connect(self) -> bool:
+        """Returns the login status.
+
+        Returns:
+        True if authenticated, False if not authenticated
+
+        Raises:
+        ClientResponseError: If there is a connection problem. Most important is
+        status 403 which is raised if invalid credentials are provided.
+        """
+        login, _ = await self._login()
+        return login.is_logged_in
+
+    async def connect_with_credentials(
+        self, username: str, password: str
+    ) -> InfoModel:
+        """Connect with given credentials.
+        Translate connect errors to easily differentiate auth and connect failures.
+
+        Returns the hub info if successfully connected.
+        Raises:
+        FibaroAuthenticationFailed: If credentials are invalid
+        FibaroConnectFailed: If connection is not possible
+        """
+        try:
+            self.set_authentication(username, password)
+            _, info = await self._login()
+            return info
+        except ClientResponseError as http_ex:
+            if http_ex.status == 403:
+                raise FibaroAuthenticationFailed from http_ex
+            raise FibaroConnectFailed from http_ex
+        except Exception as ex:
+            raise FibaroConnectFailed from ex
+
+    async def _login(self) -> tuple[LoginModel, InfoModel]:
+        login = LoginModel(self._rest_client, await self._rest_client.get("loginStatus"))
+        info = await self.read_info()
+
+        # Read the API version as it is needed regularly
+        self._api_version = info.api_version
+
+        return (login, info)
+
+    async def load_all(self, query: DeviceQuery | None = None) -> FibaroHubData:
+        """Read login status, info, rooms, scenes and devices concurrently.
+
+        See FibaroClient.load_all().
+        """
+        endpoints = {
+            "login": "loginStatus",
+            "info": "settings/info",
+            "rooms": "rooms",
+            "scenes": "scenes",
+            "devices": query.endpoint() if query else "devices",
+        }
+
+        async def timed_get(endpoint: str) -> tuple[Any, float]:
+            start = time.monotonic()
+            data = await self._rest_client.get(endpoint)
+            return (data, time.monotonic() - start)
+
+        results = dict(
+            zip(
+                endpoints,
+                await asyncio.gather(
+                    *[timed_get(endpoint) for endpoint in endpoints.values()]
+                ),
+            )
+        )
+
+        data = {name: result[0] for name, result in results.items()}
+        login = LoginModel(self._rest_client, data["login"])
+        info = InfoModel(self._rest_client, data["info"])
+        # scenes and devices are parsed after the api version is known
+        self._api_version = info.api_version
+
+        return FibaroHubData(
+            login,
+            info,
+            RoomModel.parse_rooms(data["rooms"]),
+            SceneModel.parse_scenes(data["scenes"], self._rest_client, self._api_version),
+            DeviceModel.parse_devices(
+                data["devices"], self._rest_client, self._api_version
+            ),
+            {name: result[1] for name, result in results.items()},
+        )
+
+    async def read_info(self) -> InfoModel:
+        """Read the info endpoint from home center."""
+        return InfoModel(self._rest_client, await self._rest_client.get("settings/info"))
+
+    async def read_rooms(self) -> list[RoomModel]:
+        """Read the rooms endpoint from home center."""
+        return RoomModel.parse_rooms(await self._rest_client.get("rooms"))
+
+    async def read_scenes(self) -> list[SceneModel]:
+        """Read the scenes endpoint from home center."""
+        return SceneModel.parse_scenes(
+            await self._rest_client.get("scenes"), self._rest_client, self._api_version
+        )
+
+    async def read_devices(self, query: DeviceQuery | None = None) -> list[DeviceModel]:
+        """Read the devices endpoint from home center, optionally filtered
+        by the home center."""
+        endpoint = query.endpoint() if query else "devices"
+        return DeviceModel.parse_devices(
+            await self._rest_client.get(endpoint), self._rest_client, self._api_version
+        )
+
+    async def read_device(self, fibaro_id: int) -> DeviceModel | None:
+        """Read one device from home center.
+
+        Returns None if the device does not exist or is ignored.
+        """
+        try:
+            raw_data = await self._rest_client.get(f"devices/{fibaro_id}")
+        except ClientResponseError as http_ex:
+            if http_ex.status == 404:
+                return None
+            raise
+        devices = DeviceModel.parse_devices(
+            [raw_data] if raw_data else [], self._rest_client, self._api_version
+        )
+        return devices[0] if devices else None
+
+    def register_update_handler(self, callback: callable) -> None:
+        """Register a state handler.
+
+        Must be called from a running event loop. The callback can be a plain
+        function or a coroutine function.
+        """
+        if self._state_handler:
+            raise Exception("There is already a state handler registered")
+        self._state_handler = AsyncFibaroStateHandler(
+            self._rest_client.create_push_client(), callback
+        )
+
+    async def unregister_update_handler(self) -> None:
+        """Unregister the state handler."""
+        if self._state_handler:
+            await self._state_handler.stop()
+            self._state_handler = None
+
+    async def close(self) -> None:
+        """Stop the state handler and close the connections."""
+        await self.unregister_update_handler()
+        await self._rest_client.close()
+
+    def frontend_url(self) -> str:
+        """Return the url to the web frontend of the fibaro hub."""
+        return self._frontend_url
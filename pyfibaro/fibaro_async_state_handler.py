@@ -0,0 +1,89 @@
+"""Asyncio state handler for fibaro home center."""
+
+import asyncio
+import inspect
+import logging
+
+from .common.async_rest_client import AsyncRestClient
+from .common.const import REFRESH_STATE_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class AsyncFibaroStateHandler:
+    """State handler which uses the refreshStates
+    endpoint to pull state changes from home center.
+
+    The long-poll runs as a task on the running event loop. The callback
+    can be a plain function or a coroutine function.
+    """
+
+    def __init__(self, rest_client: AsyncRestClient, callback: callable) -> None:
+        """Create the state handler and start the background task.
+
+        The rest client is owned by the state handler and closed on stop.
+        """
+        self._rest_client = rest_client
+        self._callback = callback
+        self._stop_flag = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(
+            self.run(), name=f"Task {__name__}"
+        )
+
+    async def run(self) -> None:
+        """State Handler main loop which runs in the background task."""
+
+        _LOGGER.info("Starting the state change handler")
+        last = 0
+
+        while not self._stop_flag.is_set():
+            sleep_time = 1
+            attempt = 1
+            success = False
+
+            while not success and not self._stop_flag.is_set():
+                try:
+                    state = await self._rest_client.get(
+                        f"refreshStates?last={last}", timeout=REFRESH_STATE_TIMEOUT
+                    )
+                    _LOGGER.debug(state)
+
+                    last = state.get("last")
+                    success = True
+                except Exception as ex:
+                    _LOGGER.warning("Connection Error (%s). Error: %s", attempt, ex)
+                    attempt += 1
+
+                    if attempt == 3:
+                        sleep_time = 30
+                        _LOGGER.info("Fallback to 30-second connection retry timer.")
+
+                    await self._wait(sleep_time)
+
+                if success:
+                    try:
+                        result = self._callback(state)
+                        if inspect.isawaitable(result):
+                            await result
+                    except Exception as ex:
+                        _LOGGER.warning("Error in state change callback: %s", ex)
+
+        _LOGGER.info("State change handler stopped.")
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._stop_flag.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def stop(self) -> None:
+        """Stop the state handler and cancel a pending request."""
+        _LOGGER.debug("Stopping the state change handler")
+
+        self._stop_flag.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        await self._rest_client.close()
@@ -0,0 +1,163 @@
+"""Filters to reduce the number of change notifications of numeric properties."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+
+from .fibaro_device import DeviceModel, ValueModel
+
+
+class NumericChangeFilter:
+    """Deadband and rate filter for numeric property listeners.
+
+    A change is reported when the value moved more than the deadband since
+    the last reported value. The threshold is the bigger one of
+    absolute_deadband and relative_deadband * |last reported value|.
+
+    min_interval delays changes reported earlier than that many seconds
+    after the previous notification. max_silence reports a change in any case
+    when the last notification is older than that many seconds.
+
+    A suppressed value is kept as pending when accept() gets a deliver
+    callback. The latest pending value is delivered when min_interval expired
+    and it is outside the deadband, or at the latest max_silence seconds
+    after the last notification. So the last value of a burst is not lost
+    and a quiet device reports its value within max_silence.
+
+    Values which cannot be converted to float are always reported. The filter
+    keeps its state per device, so one filter should only be used for one
+    listener.
+    """
+
+    def __init__(
+        self,
+        absolute_deadband: float = 0.0,
+        relative_deadband: float = 0.0,
+        min_interval: float = 0.0,
+        max_silence: float | None = None,
+    ) -> None:
+        """Constructor."""
+        self._absolute_deadband = absolute_deadband
+        self._relative_deadband = relative_deadband
+        self._min_interval = min_interval
+        self._max_silence = max_silence
+        self._last_reported: dict[int, tuple[float, float]] = {}
+        # latest suppressed value and its delivery by device id
+        self._pending: dict[int, tuple[float, Callable[[], None]]] = {}
+        self._timers: dict[int, threading.Timer] = {}
+        self._lock = threading.Lock()
+
+    def accept(
+        self,
+        fibaro_id: int,
+        value: float | None,
+        deliver: Callable[[], None] | None = None,
+    ) -> bool:
+        """Returns True if the value should be reported and remembers it.
+
+        When the value is suppressed and deliver is given, the value is kept
+        as pending and deliver is called from a timer thread when it becomes
+        due. A newer value replaces the pending one.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if value is None:
+                self._drop_pending(fibaro_id)
+                return True
+
+            last = self._last_reported.get(fibaro_id)
+            if last is None or self._is_relevant(value, now, *last):
+                self._drop_pending(fibaro_id)
+                self._last_reported[fibaro_id] = (value, now)
+                return True
+
+            if deliver is not None:
+                self._pending[fibaro_id] = (value, deliver)
+                if fibaro_id not in self._timers:
+                    self._schedule(fibaro_id, now, *last)
+            return False
+
+    def cancel(self) -> None:
+        """Drop all pending values without delivering them."""
+        with self._lock:
+            for fibaro_id in list(self._pending):
+                self._drop_pending(fibaro_id)
+
+    def _is_relevant(
+        self, value: float, now: float, last_value: float, last_time: float
+    ) -> bool:
+        elapsed = now - last_time
+        if elapsed < self._min_interval:
+            return False
+        if self._max_silence is not None and elapsed >= self._max_silence:
+            return True
+
+        threshold = max(
+            self._absolute_deadband, self._relative_deadband * abs(last_value)
+        )
+        return abs(value - last_value) > threshold
+
+    def _schedule(
+        self, fibaro_id: int, now: float, last_value: float, last_time: float
+    ) -> None:
+        # must be called with the lock held, starts a timer for the time
+        # the pending value can be relevant again
+        if now - last_time < self._min_interval:
+            delay = last_time + self._min_interval - now
+        elif self._max_silence is not None:
+            delay = last_time + self._max_silence - now
+        else:
+            # within the deadband and no max_silence, it is never reported
+            self._drop_pending(fibaro_id)
+            return
+        timer = threading.Timer(max(delay, 0.0), self._deliver_pending, (fibaro_id,))
+        timer.daemon = True
+        self._timers[fibaro_id] = timer
+        timer.start()
+
+    def _deliver_pending(self, fibaro_id: int) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._timers.pop(fibaro_id, None)
+            pending = self._pending.pop(fibaro_id, None)
+            if pending is None:
+                return
+            value, deliver = pending
+            last = self._last_reported.get(fibaro_id)
+            if last is not None and not self._is_relevant(value, now, *last):
+                self._pending[fibaro_id] = pending
+                self._schedule(fibaro_id, now, *last)
+                return
+            self._last_reported[fibaro_id] = (value, now)
+        deliver()
+
+    def _drop_pending(self, fibaro_id: int) -> None:
+        # must be called with the lock held
+        self._pending.pop(fibaro_id, None)
+        timer = self._timers.pop(fibaro_id, None)
+        if timer:
+            timer.cancel()
+
+
+def filter_listener(
+    property_name: str,
+    change_filter: NumericChangeFilter,
+    listener: Callable[[DeviceModel], None],
+) -> Callable[[DeviceModel], None]:
+    """Wrap a listener so that it is only called for relevant value changes.
+
+    Delayed values are delivered with the latest device from the timer
+    thread of the filter.
+    """
+
+    def filtered_listener(device: DeviceModel) -> None:
+        try:
+            value = ValueModel(device.properties, property_name).float_value()
+        except (TypeError, ValueError):
+            value = None
+        if change_filter.accept(device.fibaro_id, value, lambda: listener(device)):
+            listener(device)
+
+    return filtered_listener
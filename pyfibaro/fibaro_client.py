@@ -1,15 +1,34 @@
 """Main class for accessing fibaro API."""
 
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
 from requests import HTTPError
 
+from .common.const import (
+    DEFAULT_DISPATCH_QUEUE_SIZE,
+    DEFAULT_MAX_CONCURRENT_ACTIONS,
+    DEFAULT_POOL_SIZE,
+    STATE_CURSOR_TIMEOUT,
+)
 from .common.rest_client import RestClient
-from .fibaro_device import DeviceModel
+from .fibaro_device import ActionResult, DeviceModel
+from .fibaro_device_query import DeviceQuery
+from .fibaro_hub_data import FibaroHubData
 from .fibaro_info import InfoModel
 from .fibaro_login import LoginModel
 from .fibaro_room import RoomModel
 from .fibaro_scene import SceneModel
+from .fibaro_state_dispatcher import DispatchOverflowPolicy, DispatchStatistics
 from .fibaro_state_handler import FibaroStateHandler
 
+_LOGGER = logging.getLogger(__name__)
+
 
 class FibaroClient:
     """Fibaro client.
@@ -22,7 +41,14 @@ class FibaroClient:
     Use any other method to access API data and actions
     """
 
-    def __init__(self, url: str, ssl_verify: bool = False) -> None:
+    def __init__(
+        self,
+        url: str,
+        ssl_verify: bool = False,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        keep_alive: bool = True,
+        max_concurrent_actions: int = DEFAULT_MAX_CONCURRENT_ACTIONS,
+    ) -> None:
         """Init the fibaro client.
 
         The url needs to be in the format http(s)://<HOST>/api/.
@@ -35,11 +61,21 @@ class FibaroClient:
 
         import urllib3
         urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        pool_size and keep_alive configure the connections used for reads and
+        commands. The state handler always uses a separate connection.
+
+        max_concurrent_actions limits how many actions of bulk requests are
+        sent in parallel to the home center. It should not exceed pool_size.
         """
-        self._rest_client = RestClient(url, ssl_verify)
+        self._rest_client = RestClient(
+            url, ssl_verify, pool_size=pool_size, keep_alive=keep_alive
+        )
         self._frontend_url = url.removesuffix("/api/")
         self._api_version: int = None
         self._state_handler: FibaroStateHandler = None
+        self._max_concurrent_actions = max_concurrent_actions
+        self._action_semaphore = threading.BoundedSemaphore(max_concurrent_actions)
 
     def set_authentication(self, username: str, password: str) -> None:
         """Set the credentials."""
@@ -87,6 +123,63 @@ class FibaroClient:
 
         return (login, info)
 
+    def load_all(self, query: DeviceQuery | None = None) -> FibaroHubData:
+        """Read login status, info, rooms, scenes and devices in parallel.
+
+        This replaces connect() and the single read methods at startup, so
+        startup takes as long as the slowest endpoint instead of the sum of
+        all. The query filters the devices like in read_devices().
+
+        Raises:
+        HTTPError: Like connect(), 403 if invalid credentials are provided.
+        """
+        endpoints = {
+            "login": "loginStatus",
+            "info": "settings/info",
+            "rooms": "rooms",
+            "scenes": "scenes",
+            "devices": query.endpoint() if query else "devices",
+        }
+
+        def timed_get(endpoint: str) -> tuple[Any, float]:
+            start = time.monotonic()
+            data = self._rest_client.get(endpoint)
+            return (data, time.monotonic() - start)
+
+        with ThreadPoolExecutor(
+            max_workers=len(endpoints), thread_name_prefix=f"Thread {__name__}"
+        ) as executor:
+            futures = {
+                name: executor.submit(timed_get, endpoint)
+                for name, endpoint in endpoints.items()
+            }
+            results = {name: future.result() for name, future in futures.items()}
+
+        data = {name: result[0] for name, result in results.items()}
+        login = LoginModel(self._rest_client, data["login"])
+        info = InfoModel(self._rest_client, data["info"])
+        # scenes and devices are parsed after the api version is known
+        self._api_version = info.api_version
+
+        return FibaroHubData(
+            login,
+            info,
+            RoomModel.parse_rooms(data["rooms"]),
+            SceneModel.parse_scenes(data["scenes"], self._rest_client, self._api_version),
+            DeviceModel.parse_devices(
+                data["devices"], self._rest_client, self._api_version
+            ),
+            {name: result[1] for name, result in results.items()},
+        )
+
+    def restore_info(self, data: dict) -> InfoModel:
+        """Use hub info data saved earlier, for example to create devices
+        from a cache before connect() was called. No request is sent."""
+        info = InfoModel(self._rest_client, data)
+        if self._api_version is None:
+            self._api_version = info.api_version
+        return info
+
     def read_info(self) -> InfoModel:
         """Read the info endpoint from home center."""
         return InfoModel(self._rest_client)
@@ -99,15 +192,180 @@ class FibaroClient:
         """Read the scenes endpoint from home center."""
         return SceneModel.read_scenes(self._rest_client, self._api_version)
 
-    def read_devices(self) -> list[DeviceModel]:
-        """Read the devices endpoint from home center."""
-        return DeviceModel.read_devices(self._rest_client, self._api_version)
+    def create_rooms(self, raw_data: list[dict]) -> list[RoomModel]:
+        """Create rooms from raw rooms endpoint data, for example from a cache."""
+        return RoomModel.parse_rooms(raw_data)
+
+    def create_scenes(self, raw_data: list[dict]) -> list[SceneModel]:
+        """Create scenes from raw scenes endpoint data, for example from a
+        cache. The scenes use this client to start and stop."""
+        return SceneModel.parse_scenes(raw_data, self._rest_client, self._api_version)
+
+    def read_devices(self, query: DeviceQuery | None = None) -> list[DeviceModel]:
+        """Read the devices endpoint from home center.
+
+        With a query, the devices are filtered by the home center, so only
+        the matching devices are transferred.
+        """
+        return DeviceModel.read_devices(self._rest_client, self._api_version, query)
+
+    def create_devices(self, raw_data: list[dict]) -> list[DeviceModel]:
+        """Create devices from raw devices endpoint data, for example from a
+        cache. The devices use this client to execute actions."""
+        return DeviceModel.parse_devices(raw_data, self._rest_client, self._api_version)
+
+    def read_device(self, fibaro_id: int) -> DeviceModel | None:
+        """Read one device from home center.
+
+        Returns None if the device does not exist or is ignored.
+        """
+        try:
+            raw_data = self._rest_client.get(f"devices/{fibaro_id}")
+        except HTTPError as http_ex:
+            if http_ex.response is not None and http_ex.response.status_code == 404:
+                return None
+            raise
+        devices = DeviceModel.parse_devices(
+            [raw_data] if raw_data else [], self._rest_client, self._api_version
+        )
+        return devices[0] if devices else None
+
+    def execute_actions(
+        self, actions: list[tuple[int, str, list[Any] | None]]
+    ) -> list[ActionResult]:
+        """Execute many device actions in parallel.
+
+        Params:
+        actions: tuples of (device id, action name, list of arguments or None)
+
+        Returns one result per action in the same order. Errors are reported
+        in the result instead of being raised. Parallel bulk requests on the
+        same client share the limit of max_concurrent_actions.
+        """
+        if not actions:
+            return []
+
+        workers = min(len(actions), self._max_concurrent_actions)
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"Thread {__name__}"
+        ) as executor:
+            return list(executor.map(lambda item: self._execute_action(*item), actions))
+
+    def execute_group_action(
+        self,
+        action: str,
+        devices: list[DeviceModel | int] | None = None,
+        arguments: list[Any] | None = None,
+        filters: dict[str, list[Any]] | None = None,
+    ) -> list[ActionResult]:
+        """Execute one action on many devices.
+
+        HC3 and newer hubs get a single group action request. Older hubs
+        fall back to parallel requests per device, see execute_actions().
+
+        Params:
+        action: name of the action to call
+        devices: devices or device ids which should execute the action
+        arguments: list of arguments needed for the action
+        filters: additional hub side device filters like {"roomID": [5]},
+        only supported on HC3 and newer hubs
+
+        Returns one result per device. Filter only requests return a single
+        result with device id None.
+        """
+        fibaro_ids = [
+            device.fibaro_id if isinstance(device, DeviceModel) else device
+            for device in devices or []
+        ]
+        if not fibaro_ids and not filters:
+            # a group action without any filter applies to all devices
+            return []
+
+        if self._api_version != 5:
+            if filters:
+                raise NotImplementedError("Not supported on old fibaro hubs")
+            return self.execute_actions(
+                [(fibaro_id, action, arguments) for fibaro_id in fibaro_ids]
+            )
+
+        group_filters = [
+            {"filter": name, "value": values} for name, values in (filters or {}).items()
+        ]
+        if fibaro_ids:
+            group_filters.append({"filter": "deviceID", "value": fibaro_ids})
+        payload = {"filters": group_filters, "args": arguments or []}
+
+        _LOGGER.debug("Execute group action %s with %s.", action, payload)
+        result = None
+        error = None
+        with self._action_semaphore:
+            try:
+                result = self._rest_client.post(
+                    f"devices/groupAction/{action}", json=payload
+                )
+            except Exception as ex:
+                error = ex
+        return [
+            ActionResult(fibaro_id, action, result=result, error=error)
+            for fibaro_id in fibaro_ids or [None]
+        ]
+
+    def _execute_action(
+        self, fibaro_id: int, action: str, arguments: list[Any] | None = None
+    ) -> ActionResult:
+        with self._action_semaphore:
+            try:
+                result = DeviceModel.execute_device_action(
+                    self._rest_client, fibaro_id, action, arguments
+                )
+                return ActionResult(fibaro_id, action, result=result)
+            except Exception as ex:
+                return ActionResult(fibaro_id, action, error=ex)
+
+    def read_state_cursor(self) -> int:
+        """Read the current refreshStates cursor of the home center.
+
+        Read it before the devices and pass it to register_update_handler(),
+        then no change between reading the devices and the first poll is lost.
 
-    def register_update_handler(self, callback: callable) -> None:
-        """Register a state handler."""
+        There is no smaller endpoint which provides the cursor. The response
+        of refreshStates?last=0 also contains the changes the home center
+        still buffers, which are ignored. It is read once on a start without
+        saved state, so the cost is small compared to reading all devices.
+        """
+        state = self._rest_client.get(
+            "refreshStates?last=0", timeout=STATE_CURSOR_TIMEOUT
+        )
+        return int(state.get("last", 0))
+
+    def register_update_handler(
+        self,
+        callback: callable,
+        queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        overflow_policy: DispatchOverflowPolicy = DispatchOverflowPolicy.COALESCE,
+        last: int = 0,
+    ) -> None:
+        """Register a state handler.
+
+        The callback runs on its own thread, so a slow callback does not delay
+        polling. queue_size and overflow_policy control the queue in between.
+        Use last to resume polling at a refreshStates cursor received earlier.
+        """
         if self._state_handler:
             raise Exception("There is already a state handler registered")
-        self._state_handler = FibaroStateHandler(self._rest_client, callback)
+        self._state_handler = FibaroStateHandler(
+            self._rest_client.create_push_client(),
+            callback,
+            queue_size,
+            overflow_policy,
+            last,
+        )
+
+    def get_dispatch_statistics(self) -> DispatchStatistics | None:
+        """Returns the dispatch queue counters of the state handler or None."""
+        if self._state_handler:
+            return self._state_handler.dispatch_statistics
+        return None
 
     def unregister_update_handler(self) -> None:
         """Unregister the state handler."""
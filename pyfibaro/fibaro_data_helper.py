@@ -1,8 +1,11 @@
 """Fibaro data helper provides static method to read and
 process data for the different fibaro API endpoints."""
 
+from collections.abc import Iterable
+
 from pyfibaro.fibaro_client import FibaroClient
 from pyfibaro.fibaro_device import DeviceModel
+from pyfibaro.fibaro_device_query import DeviceQuery
 
 ZWAVE_CONTROLLER = "com.fibaro.zwavePrimaryController"
 
@@ -12,6 +15,10 @@ CONTROLLER_TYPES = [
     "com.fibaro.niceEngine",
 ]
 
+# When choosing a user account without admin rights sometimes the controller
+# device is not visible on the API. In this case we assume it has this id.
+DEFAULT_CONTROLLER_ID = 1
+
 
 def read_rooms(fibaro_client: FibaroClient) -> dict[int, str]:
     """Read dictionary mapping room ids to room name."""
@@ -22,18 +29,45 @@ def read_devices(
     fibaro_client: FibaroClient, include_devices_from_plugins: bool = False
 ) -> list[DeviceModel]:
     """Read all enabled devices."""
-    devices = fibaro_client.read_devices()
+    # let the home center filter the devices, but check the result as well
+    # in case a hub does not support all filters
+    query = DeviceQuery(
+        enabled=True, is_plugin=None if include_devices_from_plugins else False
+    )
+    devices = fibaro_client.read_devices(query)
 
     return [
         device
         for device in devices
-        if (not device.is_plugin or include_devices_from_plugins)
-        and device.enabled
+        if include_device(device, include_devices_from_plugins)
     ]
 
 
+def include_device(
+    device: DeviceModel, include_devices_from_plugins: bool = False
+) -> bool:
+    """Check if the device is enabled and optionally not from a plugin."""
+    return (not device.is_plugin or include_devices_from_plugins) and device.enabled
+
+
+def devices_by_interface(devices: Iterable[DeviceModel]) -> dict[str, list[DeviceModel]]:
+    """Index the devices by interface name.
+
+    Finding all devices with an interface is then one lookup instead of
+    checking each device.
+    """
+    interface_index: dict[str, list[DeviceModel]] = {}
+    for device in devices:
+        for interface_name in device.interfaces:
+            interface_index.setdefault(interface_name, []).append(device)
+    return interface_index
+
+
 def find_master_devices(devices: list[DeviceModel]) -> list[DeviceModel]:
-    """Find main devices only."""
+    """Find main devices only.
+
+    This rebuilds the device hierarchy on each call, use DeviceTree to keep
+    it up to date when devices change."""
     controller_ids = _get_controller_ids(devices)
 
     return _main_devices(devices, controller_ids)
@@ -45,9 +79,7 @@ def _get_controller_ids(devices: list[DeviceModel]) -> set[int]:
     zwave_controller_id = {
         device.fibaro_id for device in devices if device.type == ZWAVE_CONTROLLER}
     if len(zwave_controller_id) == 0:
-        # When choosing a user account without admin rights sometimes the controller device
-        # is not visible on the API. In this case we assume it has id = 1.
-        controller_ids.add(1)
+        controller_ids.add(DEFAULT_CONTROLLER_ID)
     return controller_ids
 
 
@@ -3,13 +3,106 @@ from __future__ import annotations
 
 import json
 import logging
-from typing import Any
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any, NoReturn
 
 from .common.const import IGNORE_DEVICE
 from .common.rest_client import RestClient
+from .fibaro_device_query import DeviceQuery
 
 _LOGGER = logging.getLogger(__name__)
 
+# Shared by all devices without changed properties, an empty frozenset is
+# not a singleton and would cost more than the rest of a device
+_NO_CHANGED_PROPERTIES: frozenset[str] = frozenset()
+
+
+def _cached(
+    cache: dict[str, Any] | None,
+    properties: dict,
+    property_name: str,
+    parse: Callable[[Any], Any],
+) -> Any:
+    """Returns the parsed value of the property from the cache. The property
+    value is only parsed on a cache miss."""
+    if cache is None:
+        return parse(properties.get(property_name))
+    try:
+        return cache[property_name]
+    except KeyError:
+        value = cache[property_name] = parse(properties.get(property_name))
+        return value
+
+
+def _parse_modes(modes: Any) -> tuple[int, ...]:
+    """Parse a list of modes given as list or comma separated string."""
+    if isinstance(modes, str) and modes != "":
+        return tuple(int(mode) for mode in modes.split(","))
+    if isinstance(modes, list):
+        return tuple(int(mode) for mode in modes)
+    return ()
+
+
+def _parse_scene_events(value: Any) -> tuple[SceneEvent, ...]:
+    """Parse the centralSceneSupport property given as list or json string."""
+    central_scene_support = []
+    if isinstance(value, list):
+        central_scene_support = value
+    if isinstance(value, str):
+        central_scene_support = json.loads(value)
+
+    result = []
+    for central_scene in central_scene_support:
+        key_id = int(central_scene.get("keyId"))
+        key_attributes = central_scene.get("keyAttributes")
+        result.append(SceneEvent(key_id, key_attributes))
+    return tuple(result)
+
+
+class _ParseError:
+    """Cached error of a property which could not be parsed."""
+
+    __slots__ = ("error", "traceback")
+
+    def __init__(self, error: Exception) -> None:
+        """Constructor."""
+        self.error = error
+        self.traceback = error.__traceback__
+
+    def raise_error(self) -> NoReturn:
+        """Raise the original error with its original traceback."""
+        raise self.error.with_traceback(self.traceback)
+
+
+def _parse_rgbw(color: Any) -> tuple[int, int, int, int] | _ParseError:
+    """Parse a "r,g,b,w" color. The error of an invalid color is returned,
+    so that it can be cached as well."""
+    try:
+        if color is None:
+            raise TypeError("Color is None.")
+        rgbw = tuple(int(i) for i in color.split(","))
+        if len(rgbw) != 4:
+            raise TypeError(f"Color does not have 4 parts: {color}")
+    except (TypeError, ValueError) as ex:
+        return _ParseError(ex)
+    return rgbw
+
+
+@lru_cache(maxsize=1024)
+def _interface_set(interfaces: tuple[str, ...]) -> frozenset[str]:
+    """Returns the frozenset of the interfaces, devices with the same
+    interfaces share one frozenset. The cache is bounded and thread safe."""
+    return frozenset(interfaces)
+
+
+def _to_int(value: Any, default: int = 0) -> int:
+    """Convert a value to int, malformed values give the default."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
 
 def _to_bool(bool_value: bool | str) -> bool:
     """Convert any value to bool."""
@@ -22,60 +115,145 @@ def _to_bool(bool_value: bool | str) -> bool:
 
 
 class DeviceModel:
-    """Model of a device."""
+    """Model of a device.
+
+    The identity and the most used fields are decoded once in the
+    constructor. raw_data must therefore not be modified, use updated() to
+    get a device with changed properties.
+
+    Values parsed from a property, like the supported modes, are cached by
+    property name. updated() keeps the cached values of unchanged properties.
+    """
+
+    __slots__ = (
+        "raw_data",
+        "_rest_client",
+        "_api_version",
+        "_changed_properties",
+        "_fibaro_id",
+        "_name",
+        "_parent_fibaro_id",
+        "_type",
+        "_base_type",
+        "_room_id",
+        "_properties",
+        "_enabled",
+        "_visible",
+        "_is_plugin",
+        "_battery_level",
+        "_interfaces",
+        "_cache",
+    )
 
     def __init__(self, data: dict, rest_client: RestClient, api_version: int) -> None:
         """Constructor."""
         self.raw_data = data
         self._rest_client = rest_client
         self._api_version = api_version
+        self._changed_properties = _NO_CHANGED_PROPERTIES
+
+        self._fibaro_id: int = data.get("id")
+        self._name: str = data.get("name")
+        self._parent_fibaro_id = _to_int(data.get("parentId", 0))
+        self._type: str | None = data.get("type")
+        self._base_type: str | None = data.get("baseType")
+        self._room_id = _to_int(data.get("roomID", 0))
+        self._properties: dict = data.get("properties", {})
+        self._enabled: bool = data.get("enabled", True)
+        self._visible: bool = data.get("visible", True)
+        self._is_plugin: bool = data.get("isPlugin", True)
+        # decoded defensively, one malformed device must not break the
+        # parsing of all devices
+        battery_level = _to_int(self._properties.get("batteryLevel", 0))
+        self._battery_level = 0 if battery_level == 255 else battery_level
+        self._interfaces = _interface_set(tuple(data.get("interfaces", ())))
+        self._cache: dict[str, Any] | None = None
 
     @property
     def fibaro_id(self) -> int:
         """Device id"""
-        return self.raw_data.get("id")
+        return self._fibaro_id
 
     @property
     def name(self) -> str:
         """Device name"""
-        return self.raw_data.get("name")
+        return self._name
 
     @property
     def parent_fibaro_id(self) -> int:
         """Id of the parent device or 0 if there is no parent."""
-        return int(self.raw_data.get("parentId", 0))
+        return self._parent_fibaro_id
 
     @property
     def type(self) -> str | None:
         """Device type."""
-        return self.raw_data.get("type")
+        return self._type
 
     @property
     def base_type(self) -> str | None:
         """Device base type."""
-        return self.raw_data.get("baseType")
+        return self._base_type
 
     @property
     def room_id(self) -> int:
         """Room id of the device or 0 if no room is assigned."""
-        return int(self.raw_data.get("roomID", 0))
+        return self._room_id
 
     @property
     def properties(self) -> dict:
         """Get the properties."""
-        return self.raw_data.get("properties", {})
+        return self._properties
+
+    @property
+    def changed_properties(self) -> frozenset[str]:
+        """Names of the properties which really changed with the last state
+        update applied by the state multiplexer."""
+        return self._changed_properties
+
+    @changed_properties.setter
+    def changed_properties(self, property_names: frozenset[str]) -> None:
+        self._changed_properties = property_names
+
+    def updated(self, property_changes: dict[str, Any]) -> DeviceModel:
+        """Returns a copy of the device with the property changes applied.
+
+        The device itself is not modified. The changed properties of the copy
+        are the keys of property_changes.
+        """
+        raw_data = dict(self.raw_data)
+        raw_data["properties"] = {**self.properties, **property_changes}
+        device = DeviceModel(raw_data, self._rest_client, self._api_version)
+        device.changed_properties = frozenset(property_changes)
+        if self._cache:
+            device._cache = {
+                key: value
+                for key, value in self._cache.items()
+                if key not in property_changes
+            }
+        return device
+
+    def _parse_cache(self) -> dict[str, Any]:
+        # created on first use, most devices have no parsed properties
+        if self._cache is None:
+            self._cache = {}
+        return self._cache
 
     @property
     def actions(self) -> dict[str, int]:
         """Get the available actions."""
         return self.raw_data.get("actions", {})
 
+    @property
+    def interfaces(self) -> frozenset[str]:
+        """Returns the interfaces, the capabilities of the device."""
+        return self._interfaces
+
     def has_interface(self, interface_name: str) -> bool:
         """Returns True if the device has the according interface defined.
 
         Interfaces are capabilities of the device.
         """
-        return interface_name in self.raw_data.get("interfaces", [])
+        return interface_name in self._interfaces
 
     @property
     def unit(self) -> str | None:
@@ -106,12 +284,12 @@ class DeviceModel:
 
         If the device does not support that flag, True is returned.
         """
-        return self.raw_data.get("enabled", True)
+        return self._enabled
 
     @property
     def visible(self) -> bool:
         """Returns the visible state of the device."""
-        return self.raw_data.get("visible", True)
+        return self._visible
 
     @property
     def is_plugin(self) -> bool:
@@ -121,13 +299,12 @@ class DeviceModel:
         True for virtual devices and Quick Apps
         False for physical devices and controllers
         """
-        return self.raw_data.get("isPlugin", True)
+        return self._is_plugin
 
     @property
     def battery_level(self) -> int:
         """Returns the battery level of the device in percent."""
-        percent = int(self.properties.get("batteryLevel", 0))
-        return 0 if percent == 255 else percent
+        return self._battery_level
 
     @property
     def has_battery_level(self) -> bool:
@@ -186,12 +363,12 @@ class DeviceModel:
     @property
     def color(self) -> ColorModel:
         """Returns the color info."""
-        return ColorModel(self.properties, "color")
+        return ColorModel(self.properties, "color", self._parse_cache())
 
     @property
     def last_color_set(self) -> ColorModel:
         """Returns the last set color info."""
-        return ColorModel(self.properties, "lastColorSet")
+        return ColorModel(self.properties, "lastColorSet", self._parse_cache())
 
     @property
     def brightness(self) -> int:
@@ -226,13 +403,9 @@ class DeviceModel:
     @property
     def supported_modes(self) -> list[int]:
         """Returns the supported modes, for example for fan or hvac devices."""
-        if "supportedModes" in self.properties:
-            modes = self.properties.get("supportedModes")
-            if isinstance(modes, str) and modes != "":
-                return [int(mode) for mode in modes.split(",")]
-            if isinstance(modes, list):
-                return [int(mode) for mode in modes]
-        return []
+        return list(
+            _cached(self._parse_cache(), self._properties, "supportedModes", _parse_modes)
+        )
 
     @property
     def has_supported_modes(self) -> bool:
@@ -252,13 +425,14 @@ class DeviceModel:
     @property
     def supported_operating_modes(self) -> list[int]:
         """Returns the supported operating modes, for example for fan or hvac devices."""
-        if "supportedOperatingModes" in self.properties:
-            modes = self.properties.get("supportedOperatingModes")
-            if isinstance(modes, str) and modes != "":
-                return [int(mode) for mode in modes.split(",")]
-            if isinstance(modes, list):
-                return [int(mode) for mode in modes]
-        return []
+        return list(
+            _cached(
+                self._parse_cache(),
+                self._properties,
+                "supportedOperatingModes",
+                _parse_modes,
+            )
+        )
 
     @property
     def has_supported_operating_modes(self) -> bool:
@@ -332,23 +506,20 @@ class DeviceModel:
     @property
     def central_scene_event(self) -> list[SceneEvent]:
         """Returns list of potential scene events."""
-        central_scene_support = []
-        value = self.properties.get("centralSceneSupport")
-        if isinstance(value, list):
-            central_scene_support = value
-        if isinstance(value, str):
-            central_scene_support = json.loads(value)
-
-        result = []
-        for central_scene in central_scene_support:
-            key_id = int(central_scene.get("keyId"))
-            key_attributes = central_scene.get("keyAttributes")
-            result.append(SceneEvent(key_id, key_attributes))
-        return result
+        return list(
+            _cached(
+                self._parse_cache(),
+                self._properties,
+                "centralSceneSupport",
+                _parse_scene_events,
+            )
+        )
 
     def execute_action(self, action: str, arguments: list[Any] | None = None) -> Any:
         """Execute a device action.
 
+        Devices read by the async client return an awaitable.
+
         Params:
         action: name of the action to call
         arguments: list of arguments needed for the action
@@ -361,22 +532,43 @@ class DeviceModel:
                 self.actions,
             )
 
-        url = f"devices/{self.fibaro_id}/action/{action}"
+        return DeviceModel.execute_device_action(
+            self._rest_client, self.fibaro_id, action, arguments
+        )
+
+    @staticmethod
+    def execute_device_action(
+        rest_client: RestClient,
+        fibaro_id: int,
+        action: str,
+        arguments: list[Any] | None = None,
+    ) -> Any:
+        """Execute a device action by device id without checking the available actions."""
+        url = f"devices/{fibaro_id}/action/{action}"
 
         args_prepared = {"args": arguments} if arguments else {}
         _LOGGER.debug(
             "Execute %s for device %s with args %s.",
             action,
-            self.fibaro_id,
+            fibaro_id,
             args_prepared,
         )
-        return self._rest_client.post(url, json=args_prepared)
+        return rest_client.post(url, json=args_prepared)
 
     @staticmethod
-    def read_devices(rest_client: RestClient, api_version: int) -> list[DeviceModel]:
-        """Returns a list of devices."""
-        raw_data: list[dict] = rest_client.get("devices")
+    def read_devices(
+        rest_client: RestClient, api_version: int, query: DeviceQuery | None = None
+    ) -> list[DeviceModel]:
+        """Returns a list of devices, optionally filtered by the home center."""
+        endpoint = query.endpoint() if query else "devices"
+        raw_data: list[dict] = rest_client.get(endpoint)
+        return DeviceModel.parse_devices(raw_data, rest_client, api_version)
 
+    @staticmethod
+    def parse_devices(
+        raw_data: list[dict], rest_client: RestClient, api_version: int
+    ) -> list[DeviceModel]:
+        """Returns a list of devices from the raw devices endpoint data."""
         devices: list[dict] = []
         for device in raw_data:
             if device.get("type") in IGNORE_DEVICE:
@@ -389,6 +581,48 @@ class DeviceModel:
         return [DeviceModel(data, rest_client, api_version) for data in devices]
 
 
+class ActionResult:
+    """Result of one action of a bulk action request."""
+
+    def __init__(
+        self,
+        fibaro_id: int | None,
+        action: str,
+        result: Any = None,
+        error: Exception | None = None,
+    ) -> None:
+        """Constructor."""
+        self._fibaro_id = fibaro_id
+        self._action = action
+        self._result = result
+        self._error = error
+
+    @property
+    def fibaro_id(self) -> int | None:
+        """Returns the device id or None for filter based group actions."""
+        return self._fibaro_id
+
+    @property
+    def action(self) -> str:
+        """Returns the name of the executed action."""
+        return self._action
+
+    @property
+    def result(self) -> Any:
+        """Returns the response of the home center or None."""
+        return self._result
+
+    @property
+    def error(self) -> Exception | None:
+        """Returns the error if the action failed, otherwise None."""
+        return self._error
+
+    @property
+    def success(self) -> bool:
+        """Returns true if the action was executed without error."""
+        return self._error is None
+
+
 class ValueModel:
     """Model to read out the value in several ways."""
 
@@ -504,10 +738,19 @@ class ValueModel:
 class ColorModel:
     """Model to read out the color."""
 
-    def __init__(self, properties: dict, property_name: str) -> None:
-        """Constructor."""
+    def __init__(
+        self,
+        properties: dict,
+        property_name: str,
+        cache: dict[str, Any] | None = None,
+    ) -> None:
+        """Constructor.
+
+        The parsed color is stored in cache by property name if given.
+        """
         self._properties = properties
         self._property_name = property_name
+        self._cache = cache
 
     @property
     def has_color(self) -> bool:
@@ -528,12 +771,9 @@ class ColorModel:
         Raises:
         TypeError is raised for invalid values.
         """
-        color = self._properties.get(self._property_name)
-        if color is None:
-            raise TypeError("Color is None.")
-        rgbw = tuple(int(i) for i in color.split(","))
-        if len(rgbw) != 4:
-            raise TypeError(f"Color does not have 4 parts: {color}")
+        rgbw = _cached(self._cache, self._properties, self._property_name, _parse_rgbw)
+        if isinstance(rgbw, _ParseError):
+            rgbw.raise_error()
         return rgbw
 
 
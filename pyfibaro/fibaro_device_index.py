@@ -0,0 +1,119 @@
+"""Secondary indexes of the devices in a device snapshot."""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Iterator
+
+from .fibaro_device import DeviceModel
+from .fibaro_device_query import DeviceQuery
+
+ROOM_ID = "room_id"
+DEVICE_TYPE = "device_type"
+BASE_TYPE = "base_type"
+INTERFACE = "interface"
+PARENT_ID = "parent_id"
+
+
+class DeviceIndex:
+    """Device ids by room, type, base type, interface and parent device.
+
+    The index is immutable like the snapshot which owns it. updated()
+    returns a new index and only copies the entries of the changed devices,
+    unchanged entries are shared.
+    """
+
+    def __init__(self, buckets: dict[str, dict[Hashable, frozenset[int]]]) -> None:
+        """Constructor, use build() to index devices."""
+        self._buckets = buckets
+
+    @staticmethod
+    def build(devices: Iterable[DeviceModel]) -> DeviceIndex:
+        """Returns the index of the devices."""
+        buckets: dict[str, dict[Hashable, set[int]]] = {}
+        for device in devices:
+            for field, key in _index_keys(device):
+                buckets.setdefault(field, {}).setdefault(key, set()).add(
+                    device.fibaro_id
+                )
+        return DeviceIndex(
+            {
+                field: {key: frozenset(ids) for key, ids in index.items()}
+                for field, index in buckets.items()
+            }
+        )
+
+    def updated(
+        self,
+        removed_devices: Iterable[DeviceModel],
+        added_devices: Iterable[DeviceModel],
+    ) -> DeviceIndex:
+        """Returns a new index without the removed and with the added devices.
+
+        A modified device is passed as removed in its old and as added in its
+        new state.
+        """
+        changes: dict[tuple[str, Hashable], tuple[set[int], set[int]]] = {}
+        for device in removed_devices:
+            for index_key in _index_keys(device):
+                changes.setdefault(index_key, (set(), set()))[0].add(device.fibaro_id)
+        for device in added_devices:
+            for index_key in _index_keys(device):
+                changes.setdefault(index_key, (set(), set()))[1].add(device.fibaro_id)
+
+        buckets = dict(self._buckets)
+        copied_fields: set[str] = set()
+        for (field, key), (removed_ids, added_ids) in changes.items():
+            if removed_ids == added_ids:
+                continue
+            if field not in copied_fields:
+                buckets[field] = dict(buckets.get(field, {}))
+                copied_fields.add(field)
+            ids = (buckets[field].get(key, frozenset()) - removed_ids) | added_ids
+            if ids:
+                buckets[field][key] = frozenset(ids)
+            else:
+                buckets[field].pop(key, None)
+        return DeviceIndex(buckets)
+
+    def ids(self, field: str, key: Hashable) -> frozenset[int]:
+        """Returns the ids of the devices with the key in the indexed field."""
+        return self._buckets.get(field, {}).get(key, frozenset())
+
+    def keys(self, field: str) -> list[Hashable]:
+        """Returns the distinct values of the indexed field, like all room ids."""
+        return list(self._buckets.get(field, {}))
+
+    def find(self, query: DeviceQuery) -> frozenset[int] | None:
+        """Returns the ids of the devices matching the indexed criteria of
+        the query or None if the query has no indexed criteria.
+
+        The other criteria of the query are not checked.
+        """
+        criteria = [
+            (ROOM_ID, query.room_id),
+            (DEVICE_TYPE, query.device_type),
+            (BASE_TYPE, query.base_type),
+            (INTERFACE, query.interface),
+            (PARENT_ID, query.parent_id),
+        ]
+        candidates = sorted(
+            (self.ids(field, key) for field, key in criteria if key is not None),
+            key=len,
+        )
+        if not candidates:
+            return None
+        # intersect starting with the smallest set
+        result = candidates[0]
+        for ids in candidates[1:]:
+            result = result & ids
+        return result
+
+
+def _index_keys(device: DeviceModel) -> Iterator[tuple[str, Hashable]]:
+    """Returns the index entries of the device."""
+    yield (ROOM_ID, device.room_id)
+    yield (DEVICE_TYPE, device.type)
+    yield (BASE_TYPE, device.base_type)
+    yield (PARENT_ID, device.parent_fibaro_id)
+    for interface_name in device.interfaces:
+        yield (INTERFACE, interface_name)
@@ -7,12 +7,20 @@ device detection logic and exposes properties in a more understandable way.
 from __future__ import annotations
 
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterable
 
-from .fibaro_state_multiplexer import FibaroStateMultiplexer
+from .fibaro_change_filter import NumericChangeFilter
+from .fibaro_state_multiplexer import FibaroStateBatch, FibaroStateMultiplexer
 from .fibaro_client import FibaroClient
 from .fibaro_device import DeviceModel
+from .fibaro_device_query import DeviceQuery
+from .fibaro_device_tree import DeviceTree
+from .fibaro_info import InfoModel
+from .fibaro_room import RoomModel
+from .fibaro_scene import SceneModel
 from .fibaro_state_resolver import FibaroEvent
+from .fibaro_state_store import FibaroStateStore
+from .fibaro_subscription_registry import Subscription
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,38 +29,145 @@ class FibaroDeviceManager:
     """Controller to access fibaro API in a more structured way."""
 
     def __init__(
-        self, fibaro_client: FibaroClient, include_devices_from_plugins: bool = False
+        self,
+        fibaro_client: FibaroClient,
+        include_devices_from_plugins: bool = False,
+        coalesce_window: float | None = None,
+        state_store: FibaroStateStore | None = None,
+        warm_start: bool = False,
     ) -> None:
         """Construct the fibaro device manager.
         - Load initial data
-        - Open push channel"""
+        - Open push channel
+
+        See FibaroStateMultiplexer for the coalesce_window, state_store and
+        warm_start options."""
         self._fibaro_client = fibaro_client
         self._fibaro_state_multiplexer = FibaroStateMultiplexer(
-            fibaro_client, include_devices_from_plugins
+            fibaro_client,
+            include_devices_from_plugins,
+            coalesce_window,
+            state_store,
+            warm_start=warm_start,
         )
         self._fibaro_state_multiplexer.start()
 
     def add_change_listener(
         self, fibaro_id: int, listener: Callable[[DeviceModel], None]
-    ) -> Callable[[], None]:
+    ) -> Subscription:
         """Add a listener to get property changes.
         Provides the updated device data.
 
-        Returns: Callback which can be used to unregister the listener"""
+        Returns: Subscription handle, call it to unregister the listener"""
         return self._fibaro_state_multiplexer.add_change_listener(fibaro_id, listener)
 
+    def add_property_listener(
+        self,
+        fibaro_id: int | None,
+        property_name: str,
+        listener: Callable[[DeviceModel], None],
+        change_filter: NumericChangeFilter | None = None,
+    ) -> Subscription:
+        """Add a listener to get changes of one property.
+        Provides the updated device data. With fibaro_id None, changes of the
+        property on all devices are reported. Use a change filter to skip
+        small changes of numeric properties.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_property_listener(
+            fibaro_id, property_name, listener, change_filter
+        )
+
     def add_event_listener(
         self, fibaro_id: int, listener: Callable[[FibaroEvent], None]
-    ) -> Callable[[], None]:
+    ) -> Subscription:
         """Add scene event listener.
 
-        Returns: Callback which can be used to unregister the listener"""
+        Returns: Subscription handle, call it to unregister the listener"""
         return self._fibaro_state_multiplexer.add_event_listener(fibaro_id, listener)
 
+    def add_event_type_listener(
+        self, event_type: str | None, listener: Callable[[FibaroEvent], None]
+    ) -> Subscription:
+        """Add listener for all events of one type or for all events with
+        event_type None, including events without device.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_event_type_listener(
+            event_type, listener
+        )
+
+    def add_batch_listener(
+        self, listener: Callable[[FibaroStateBatch], None]
+    ) -> Subscription:
+        """Add a listener which gets all changed devices, their changed
+        properties and events of one poll cycle in one call.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_batch_listener(listener)
+
+    def add_device_added_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add listener for devices added on the hub while running.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_device_added_listener(listener)
+
+    def add_device_removed_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add listener for devices removed on the hub while running.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_device_removed_listener(listener)
+
+    def add_device_modified_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add listener for devices modified on the hub while running.
+
+        Returns: Subscription handle, call it to unregister the listener"""
+        return self._fibaro_state_multiplexer.add_device_modified_listener(listener)
+
+    def resync_devices(self, fibaro_ids: Iterable[int]) -> None:
+        """Read the given devices again from Fibaro Home Center and
+        notify listeners about the differences."""
+        self._fibaro_state_multiplexer.resync_devices(fibaro_ids)
+
+    def get_listener_counts(self) -> dict[int, int]:
+        """Get the number of registered listeners per device id."""
+        return self._fibaro_state_multiplexer.get_listener_counts()
+
+    def get_info(self) -> InfoModel:
+        """Get the info of the Fibaro Home Center."""
+        return self._fibaro_state_multiplexer.get_info()
+
+    def get_rooms(self) -> list[RoomModel]:
+        """Get the rooms of the Fibaro Home Center."""
+        return self._fibaro_state_multiplexer.get_rooms()
+
+    def get_scenes(self) -> list[SceneModel]:
+        """Get the scenes of the Fibaro Home Center."""
+        return self._fibaro_state_multiplexer.get_scenes()
+
     def get_devices(self) -> list[DeviceModel]:
         """Get current devices from Fibaro Home Center."""
         return self._fibaro_state_multiplexer.get_devices()
 
+    def find_devices(self, query: DeviceQuery) -> list[DeviceModel]:
+        """Get current devices matching all criteria of the query, for example
+        find_devices(DeviceQuery(room_id=5, interface="light")).
+
+        Room, type, base type, interface and parent criteria are looked up
+        in an index which is updated with each device change."""
+        return self._fibaro_state_multiplexer.find_devices(query)
+
+    def get_device_tree(self) -> DeviceTree:
+        """Get the parent and child relations of the current devices, for
+        example to find the main device of an endpoint."""
+        return self._fibaro_state_multiplexer.get_device_tree()
+
     def close(self) -> None:
         """Close push channel."""
         self._fibaro_state_multiplexer.stop()
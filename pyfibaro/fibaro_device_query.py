@@ -0,0 +1,103 @@
+"""Query to filter devices on the devices endpoint of the home center."""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from urllib.parse import urlencode
+
+if TYPE_CHECKING:
+    from .fibaro_device import DeviceModel
+
+
+class DeviceQuery:
+    """Filter for the devices endpoint which is evaluated by the home center.
+
+    Only the matching devices are transferred and parsed. All criteria which
+    are set must match. The same query can be used to find devices in the
+    device snapshot of the state multiplexer.
+    """
+
+    def __init__(
+        self,
+        room_id: int | None = None,
+        device_type: str | None = None,
+        base_type: str | None = None,
+        interface: str | None = None,
+        parent_id: int | None = None,
+        enabled: bool | None = None,
+        visible: bool | None = None,
+        is_plugin: bool | None = None,
+    ) -> None:
+        """Constructor, criteria which are None are not used."""
+        self._room_id = room_id
+        self._device_type = device_type
+        self._base_type = base_type
+        self._interface = interface
+        self._parent_id = parent_id
+        self._enabled = enabled
+        self._visible = visible
+        self._is_plugin = is_plugin
+
+    @property
+    def room_id(self) -> int | None:
+        """Returns the room id criterion."""
+        return self._room_id
+
+    @property
+    def device_type(self) -> str | None:
+        """Returns the device type criterion."""
+        return self._device_type
+
+    @property
+    def base_type(self) -> str | None:
+        """Returns the base type criterion."""
+        return self._base_type
+
+    @property
+    def interface(self) -> str | None:
+        """Returns the interface criterion."""
+        return self._interface
+
+    @property
+    def parent_id(self) -> int | None:
+        """Returns the parent device id criterion."""
+        return self._parent_id
+
+    @property
+    def params(self) -> dict[str, str]:
+        """Returns the query parameters as expected by the home center."""
+        params = {
+            "roomID": self._room_id,
+            "type": self._device_type,
+            "baseType": self._base_type,
+            "interface": self._interface,
+            "parentId": self._parent_id,
+            "enabled": self._enabled,
+            "visible": self._visible,
+            "isPlugin": self._is_plugin,
+        }
+        return {
+            name: str(value).lower() if isinstance(value, bool) else str(value)
+            for name, value in params.items()
+            if value is not None
+        }
+
+    def endpoint(self, base_endpoint: str = "devices") -> str:
+        """Returns the endpoint including the query string."""
+        params = self.params
+        if not params:
+            return base_endpoint
+        return f"{base_endpoint}?{urlencode(params)}"
+
+    def matches(self, device: DeviceModel) -> bool:
+        """Returns true if the device matches all criteria."""
+        return (
+            (self._room_id is None or device.room_id == self._room_id)
+            and (self._device_type is None or device.type == self._device_type)
+            and (self._base_type is None or device.base_type == self._base_type)
+            and (self._interface is None or device.has_interface(self._interface))
+            and (self._parent_id is None or device.parent_fibaro_id == self._parent_id)
+            and (self._enabled is None or device.enabled == self._enabled)
+            and (self._visible is None or device.visible == self._visible)
+            and (self._is_plugin is None or device.is_plugin == self._is_plugin)
+        )
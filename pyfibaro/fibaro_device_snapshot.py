@@ -0,0 +1,100 @@
+"""Immutable view on the device state of the state multiplexer."""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+
+from .fibaro_device import DeviceModel
+from .fibaro_device_index import DeviceIndex
+from .fibaro_device_query import DeviceQuery
+
+
+class FibaroDeviceSnapshot:
+    """Consistent, versioned view on all devices.
+
+    The state multiplexer never modifies a published snapshot or its devices.
+    Each poll cycle with changes publishes a new snapshot with a higher
+    version, so readers can use a snapshot without locking and compare
+    versions to detect changes.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        devices: dict[int, DeviceModel],
+        index: DeviceIndex | None = None,
+    ) -> None:
+        """Constructor, the snapshot takes ownership of the devices dict.
+
+        The index must match the devices, without index it is built on
+        first use.
+        """
+        self._version = version
+        self._devices = MappingProxyType(devices)
+        self._index = index
+
+    @property
+    def version(self) -> int:
+        """Returns the version which increases with every published change."""
+        return self._version
+
+    @property
+    def devices(self) -> Mapping[int, DeviceModel]:
+        """Returns the devices by device id."""
+        return self._devices
+
+    @property
+    def index(self) -> DeviceIndex:
+        """Returns the index of the devices by room, type, base type,
+        interface and parent device."""
+        index = self._index
+        if index is None:
+            index = self._index = DeviceIndex.build(self._devices.values())
+        return index
+
+    def get(self, fibaro_id: int) -> DeviceModel | None:
+        """Returns the device with the given id or None."""
+        return self._devices.get(fibaro_id)
+
+    def find(self, query: DeviceQuery) -> list[DeviceModel]:
+        """Returns the devices matching the query ordered by device id.
+
+        Room, type, base type, interface and parent criteria are resolved by
+        the index, so the cost depends on the number of matching devices.
+        """
+        ids = self.index.find(query)
+        if ids is None:
+            # no indexed criterion, the matches are sorted after filtering
+            return sorted(
+                (device for device in self._devices.values() if query.matches(device)),
+                key=lambda device: device.fibaro_id,
+            )
+        candidates = (self._devices[fibaro_id] for fibaro_id in sorted(ids))
+        return [device for device in candidates if query.matches(device)]
+
+    def updated(
+        self, devices: dict[int, DeviceModel], changed_ids: Iterable[int]
+    ) -> FibaroDeviceSnapshot:
+        """Returns the next version of the snapshot with the devices.
+
+        changed_ids are the devices which were added, removed or modified
+        other than in their properties. Only their index entries are updated,
+        property changes do not affect the index.
+        """
+        index = self._index
+        if index is not None:
+            changed_ids = set(changed_ids)
+            index = index.updated(
+                [
+                    self._devices[fibaro_id]
+                    for fibaro_id in changed_ids
+                    if fibaro_id in self._devices
+                ],
+                [devices[fibaro_id] for fibaro_id in changed_ids if fibaro_id in devices],
+            )
+        return FibaroDeviceSnapshot(self._version + 1, devices, index)
+
+    def __len__(self) -> int:
+        """Returns the number of devices."""
+        return len(self._devices)
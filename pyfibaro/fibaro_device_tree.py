@@ -0,0 +1,238 @@
+"""Parent and child relations of the devices and their main devices."""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Iterable
+
+from .fibaro_data_helper import (
+    CONTROLLER_TYPES,
+    DEFAULT_CONTROLLER_ID,
+    ZWAVE_CONTROLLER,
+)
+from .fibaro_device import DeviceModel
+
+
+class DeviceTree:
+    """Device hierarchy which is updated incrementally.
+
+    A main device is what a user sees as one physical device, its child
+    devices are endpoints of it. The rules are the same as in
+    find_master_devices(): devices hanging on a controller or on nothing are
+    main devices, except for plugins with two child levels where the first
+    child level are the main devices.
+
+    The main device of each device is cached. Adding, removing or moving a
+    device only clears the cache of the devices below the same top level
+    device. All methods are thread safe.
+
+    version is the version of the device snapshot the tree reflects, when it
+    is maintained by the state multiplexer.
+    """
+
+    def __init__(self, devices: Iterable[DeviceModel] = ()) -> None:
+        """Constructor."""
+        self._lock = threading.RLock()
+        self._version = 0
+        self._devices: dict[int, DeviceModel] = {}
+        # child ids by parent id, dicts keep the insertion order
+        self._children: dict[int, dict[int, None]] = {}
+        self._controller_ids: set[int] = set()
+        self._zwave_controller_ids: set[int] = set()
+        # main device id or None by device id
+        self._main_ids: dict[int, int | None] = {}
+        for device in devices:
+            self.update(device)
+
+    @property
+    def version(self) -> int:
+        """Returns the snapshot version of the devices."""
+        return self._version
+
+    def reset(self, devices: Iterable[DeviceModel], version: int = 0) -> None:
+        """Replace all devices, the tree object stays the same."""
+        with self._lock:
+            self._devices.clear()
+            self._children.clear()
+            self._controller_ids.clear()
+            self._zwave_controller_ids.clear()
+            self._main_ids.clear()
+            for device in devices:
+                self.update(device)
+            self._version = version
+
+    def apply(
+        self,
+        version: int,
+        devices: Iterable[DeviceModel],
+        removed_ids: Iterable[int] = (),
+    ) -> None:
+        """Remove and update devices in one step and set the version."""
+        with self._lock:
+            for fibaro_id in removed_ids:
+                self.remove(fibaro_id)
+            for device in devices:
+                self.update(device)
+            self._version = version
+
+    def update(self, device: DeviceModel) -> None:
+        """Add a device or replace it with a newer state.
+
+        Only a device with a new parent or controller state clears cached
+        main devices.
+        """
+        with self._lock:
+            fibaro_id = device.fibaro_id
+            known_device = self._devices.get(fibaro_id)
+            if known_device is not None:
+                if known_device.parent_fibaro_id == device.parent_fibaro_id and (
+                    known_device.type == device.type
+                ):
+                    self._devices[fibaro_id] = device
+                    return
+                self._remove(known_device)
+
+            self._devices[fibaro_id] = device
+            self._children.setdefault(device.parent_fibaro_id, {})[fibaro_id] = None
+            if device.type in CONTROLLER_TYPES:
+                self._controller_ids.add(fibaro_id)
+                if device.type == ZWAVE_CONTROLLER:
+                    self._zwave_controller_ids.add(fibaro_id)
+                self._main_ids.clear()
+            else:
+                self._invalidate(fibaro_id)
+
+    def remove(self, fibaro_id: int) -> None:
+        """Remove a device, its children are kept."""
+        with self._lock:
+            device = self._devices.get(fibaro_id)
+            if device is not None:
+                self._remove(device)
+
+    def get(self, fibaro_id: int) -> DeviceModel | None:
+        """Returns the device with the given id or None."""
+        return self._devices.get(fibaro_id)
+
+    def children_of(self, fibaro_id: int) -> list[DeviceModel]:
+        """Returns the direct children of the device."""
+        with self._lock:
+            return [
+                self._devices[child_id]
+                for child_id in self._children.get(fibaro_id, ())
+            ]
+
+    def parent_of(self, fibaro_id: int) -> DeviceModel | None:
+        """Returns the parent device or None."""
+        with self._lock:
+            device = self._devices.get(fibaro_id)
+            if device is None:
+                return None
+            return self._devices.get(device.parent_fibaro_id)
+
+    @property
+    def controller_ids(self) -> set[int]:
+        """Returns the ids of the controller devices."""
+        with self._lock:
+            if self._zwave_controller_ids:
+                return set(self._controller_ids)
+            return self._controller_ids | {DEFAULT_CONTROLLER_ID}
+
+    def main_device_of(self, fibaro_id: int) -> DeviceModel | None:
+        """Returns the main device the device belongs to, the device itself
+        if it is a main device or None for controllers and plugin devices
+        which only group main devices."""
+        with self._lock:
+            try:
+                main_id = self._main_ids[fibaro_id]
+            except KeyError:
+                main_id = self._main_ids[fibaro_id] = self._resolve_main_id(
+                    fibaro_id
+                )
+            return None if main_id is None else self._devices.get(main_id)
+
+    def main_devices(self) -> list[DeviceModel]:
+        """Returns all main devices."""
+        with self._lock:
+            return [
+                device
+                for fibaro_id, device in self._devices.items()
+                if self.main_device_of(fibaro_id) is device
+            ]
+
+    def __len__(self) -> int:
+        """Returns the number of devices."""
+        return len(self._devices)
+
+    def _remove(self, device: DeviceModel) -> None:
+        fibaro_id = device.fibaro_id
+        if fibaro_id in self._controller_ids:
+            self._main_ids.clear()
+        else:
+            # the cache is cleared before the device leaves its old position
+            self._invalidate(fibaro_id)
+        self._controller_ids.discard(fibaro_id)
+        self._zwave_controller_ids.discard(fibaro_id)
+
+        del self._devices[fibaro_id]
+        siblings = self._children.get(device.parent_fibaro_id)
+        if siblings is not None:
+            siblings.pop(fibaro_id, None)
+            if not siblings:
+                del self._children[device.parent_fibaro_id]
+
+    def _is_top_device(self, device: DeviceModel, controller_ids: set[int]) -> bool:
+        # devices hanging on a controller or on nothing
+        parent_id = device.parent_fibaro_id
+        return parent_id in controller_ids or (
+            parent_id == 0 and device.fibaro_id not in controller_ids
+        )
+
+    def _top_id(self, fibaro_id: int) -> int | None:
+        # walk up to the top level device or the highest known ancestor
+        controller_ids = self.controller_ids
+        visited = set()
+        node_id = fibaro_id
+        while node_id not in visited:
+            visited.add(node_id)
+            device = self._devices.get(node_id)
+            if device is None or self._is_top_device(device, controller_ids):
+                return node_id
+            if device.parent_fibaro_id not in self._devices:
+                return node_id
+            node_id = device.parent_fibaro_id
+        return None
+
+    def _invalidate(self, fibaro_id: int) -> None:
+        # clear the cached main devices below the top level device, only
+        # they depend on the position of the device
+        top_id = self._top_id(fibaro_id)
+        pending = [fibaro_id if top_id is None else top_id]
+        visited = set()
+        while pending:
+            node_id = pending.pop()
+            if node_id in visited:
+                continue
+            visited.add(node_id)
+            self._main_ids.pop(node_id, None)
+            pending.extend(self._children.get(node_id, ()))
+
+    def _resolve_main_id(self, fibaro_id: int) -> int | None:
+        controller_ids = self.controller_ids
+        top_id = self._top_id(fibaro_id)
+        top_device = self._devices.get(top_id) if top_id is not None else None
+        if top_device is None or not self._is_top_device(top_device, controller_ids):
+            return None
+
+        direct_children = self._children.get(top_id, {})
+        if any(child_id in self._children for child_id in direct_children):
+            # plugin with two levels, the first child level are main devices
+            main_ids = direct_children
+        else:
+            main_ids = {top_id: None}
+
+        node_id = fibaro_id
+        while node_id != top_id:
+            if node_id in main_ids:
+                return node_id
+            node_id = self._devices[node_id].parent_fibaro_id
+        return top_id if top_id in main_ids else None
@@ -0,0 +1,67 @@
+"""All data of the home center which is needed to start an integration."""
+
+from __future__ import annotations
+
+from .fibaro_device import DeviceModel
+from .fibaro_info import InfoModel
+from .fibaro_login import LoginModel
+from .fibaro_room import RoomModel
+from .fibaro_scene import SceneModel
+
+
+class FibaroHubData:
+    """Result of load_all() of the fibaro clients.
+
+    Contains the login status, hub info, rooms, scenes and devices and how
+    long each endpoint took in seconds.
+    """
+
+    def __init__(
+        self,
+        login: LoginModel,
+        info: InfoModel,
+        rooms: list[RoomModel],
+        scenes: list[SceneModel],
+        devices: list[DeviceModel],
+        timings: dict[str, float],
+    ) -> None:
+        """Constructor."""
+        self._login = login
+        self._info = info
+        self._rooms = rooms
+        self._scenes = scenes
+        self._devices = devices
+        self._timings = timings
+
+    @property
+    def login(self) -> LoginModel:
+        """Returns the login status."""
+        return self._login
+
+    @property
+    def info(self) -> InfoModel:
+        """Returns the hub info."""
+        return self._info
+
+    @property
+    def rooms(self) -> list[RoomModel]:
+        """Returns the rooms."""
+        return self._rooms
+
+    @property
+    def scenes(self) -> list[SceneModel]:
+        """Returns the scenes."""
+        return self._scenes
+
+    @property
+    def devices(self) -> list[DeviceModel]:
+        """Returns the devices."""
+        return self._devices
+
+    @property
+    def timings(self) -> dict[str, float]:
+        """Returns the request duration in seconds by endpoint.
+
+        The keys are "login", "info", "rooms", "scenes" and "devices".
+        """
+        return self._timings
@@ -1,5 +1,7 @@
 """Endpoint object to access the endpoint settings/info"""
 
+from __future__ import annotations
+
 import logging
 
 from .common.const import (
@@ -15,9 +17,14 @@ _LOGGER = logging.getLogger(__name__)
 class InfoModel:
     """Fibaro info."""
 
-    def __init__(self, rest_client: RestClient) -> None:
-        """Load the data."""
-        self.raw_data: dict = rest_client.get("settings/info")
+    def __init__(self, rest_client: RestClient, data: dict | None = None) -> None:
+        """Load the data.
+
+        If data is given, it is used as is and no request is sent.
+        """
+        if data is None:
+            data = rest_client.get("settings/info")
+        self.raw_data: dict = data
 
     @property
     def current_version(self) -> str:
@@ -1,14 +1,21 @@
 """Endpoint object to access the endpoint settings/info"""
 
+from __future__ import annotations
+
 from .common.rest_client import RestClient
 
 
 class LoginModel:
     """Fibaro login."""
 
-    def __init__(self, rest_client: RestClient) -> None:
-        """Load the data."""
-        self.raw_data: dict = rest_client.get("loginStatus")
+    def __init__(self, rest_client: RestClient, data: dict | None = None) -> None:
+        """Load the data.
+
+        If data is given, it is used as is and no request is sent.
+        """
+        if data is None:
+            data = rest_client.get("loginStatus")
+        self.raw_data: dict = data
 
     @property
     def is_logged_in(self) -> bool:
@@ -26,4 +26,9 @@ class RoomModel:
     def read_rooms(rest_client: RestClient) -> list[RoomModel]:
         """Returns a list of rooms."""
         raw_data: list = rest_client.get("rooms")
+        return RoomModel.parse_rooms(raw_data)
+
+    @staticmethod
+    def parse_rooms(raw_data: list[dict]) -> list[RoomModel]:
+        """Returns a list of rooms from the raw rooms endpoint data."""
         return [RoomModel(data) for data in raw_data]
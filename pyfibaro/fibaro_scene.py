@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import logging
+from typing import Any
 
 from .common.rest_client import RestClient
 
@@ -43,39 +44,51 @@ class SceneModel:
         else:
             return not self.raw_data.get("hidden", False)
 
-    def start(self, user_pin: str | None = None) -> None:
-        """Start a scene."""
+    def start(self, user_pin: str | None = None) -> Any:
+        """Start a scene.
+
+        Scenes read by the async client return an awaitable.
+        """
         if self._api_version == 4:
             if user_pin:
                 raise NotImplementedError("Not supported on old fibaro hubs")
-            self._send_action_v4("start")
-        else:
-            self._send_action_v5("execute", user_pin)
+            return self._send_action_v4("start")
+        return self._send_action_v5("execute", user_pin)
 
-    def stop(self, user_pin: str | None = None) -> None:
-        """Stop a scene."""
+    def stop(self, user_pin: str | None = None) -> Any:
+        """Stop a scene.
+
+        Scenes read by the async client return an awaitable.
+        """
         if self._api_version == 4:
             if user_pin:
                 raise NotImplementedError("Not supported on old fibaro hubs")
-            self._send_action_v4("stop")
-        else:
-            self._send_action_v5("kill", user_pin)
+            return self._send_action_v4("stop")
+        return self._send_action_v5("kill", user_pin)
 
-    def _send_action_v4(self, action: str) -> None:
+    def _send_action_v4(self, action: str) -> Any:
         url = f"scenes/{self.fibaro_id}/action/{action}"
-        self._rest_client.post(url)
+        return self._rest_client.post(url)
 
-    def _send_action_v5(self, action: str, user_pin: str | None) -> None:
+    def _send_action_v5(self, action: str, user_pin: str | None) -> Any:
         url = f"scenes/{self.fibaro_id}/{action}"
         if user_pin:
-            self._rest_client.post(url, {}, http_headers={"Fibaro-User-PIN": user_pin})
-        else:
-            self._rest_client.post(url, {})
+            return self._rest_client.post(
+                url, {}, http_headers={"Fibaro-User-PIN": user_pin}
+            )
+        return self._rest_client.post(url, {})
 
     @staticmethod
     def read_scenes(rest_client: RestClient, api_version: int) -> list[SceneModel]:
         """Returns a list of scenes."""
         raw_data: list = rest_client.get("scenes")
+        return SceneModel.parse_scenes(raw_data, rest_client, api_version)
+
+    @staticmethod
+    def parse_scenes(
+        raw_data: list[dict], rest_client: RestClient, api_version: int
+    ) -> list[SceneModel]:
+        """Returns a list of scenes from the raw scenes endpoint data."""
         scenes: list[dict] = []
         for scene in raw_data:
             if "id" not in scene or "name" not in scene:
@@ -0,0 +1,151 @@
+"""State dispatcher which decouples the refreshStates polling from the callback."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any
+
+from .common.const import DISPATCH_STOP_TIMEOUT
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class DispatchOverflowPolicy(Enum):
+    """Behaviour when the dispatch queue is full."""
+
+    # Polling waits until the callback has consumed an entry
+    BLOCK = "block"
+    # The oldest queued state is discarded
+    DROP_OLDEST = "drop_oldest"
+    # The new state is merged into the newest queued state, nothing is lost
+    COALESCE = "coalesce"
+
+
+class DispatchStatistics:
+    """Counters of the dispatch queue."""
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.dispatched = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+
+
+class FibaroStateDispatcher(threading.Thread):
+    """Worker thread which passes queued states to the callback.
+
+    A slow callback therefore never delays the next refreshStates request,
+    except with DispatchOverflowPolicy.BLOCK and a full queue.
+    """
+
+    def __init__(
+        self,
+        callback: callable,
+        queue_size: int,
+        overflow_policy: DispatchOverflowPolicy,
+    ) -> None:
+        """Create the dispatcher and start the worker thread."""
+
+        super().__init__(name=f"Thread {__name__}")
+
+        self._callback = callback
+        self._queue_size = max(queue_size, 1)
+        self._overflow_policy = overflow_policy
+        self._queue: deque[tuple[float, Any]] = deque()
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._statistics = DispatchStatistics()
+
+        # stop unconditionally on exit
+        self.daemon = True
+
+        self.start()
+
+    @property
+    def statistics(self) -> DispatchStatistics:
+        """Returns the counters of the dispatch queue."""
+        return self._statistics
+
+    def put(self, state: Any) -> None:
+        """Queue a state for the callback."""
+        with self._condition:
+            if len(self._queue) >= self._queue_size:
+                if self._overflow_policy == DispatchOverflowPolicy.BLOCK:
+                    self._condition.wait_for(
+                        lambda: len(self._queue) < self._queue_size or self._stopped
+                    )
+                elif self._overflow_policy == DispatchOverflowPolicy.DROP_OLDEST:
+                    self._queue.popleft()
+                    self._statistics.dropped += 1
+                    _LOGGER.warning("Dispatch queue full, dropped oldest state")
+                else:
+                    received, queued_state = self._queue.pop()
+                    self._queue.append((received, _merge_states(queued_state, state)))
+                    self._statistics.coalesced += 1
+                    return
+
+            if self._stopped:
+                return
+            self._queue.append((time.monotonic(), state))
+            self._update_depth()
+            self._condition.notify_all()
+
+    def run(self) -> None:
+        """Dispatcher main loop which runs in this thread."""
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopped)
+                if self._stopped:
+                    break
+                received, state = self._queue.popleft()
+                self._update_depth()
+                self._condition.notify_all()
+
+            lag = time.monotonic() - received
+            self._statistics.last_lag = lag
+            self._statistics.max_lag = max(self._statistics.max_lag, lag)
+
+            try:
+                self._callback(state)
+            except Exception as ex:
+                _LOGGER.warning("Error in state change callback: %s", ex)
+            self._statistics.dispatched += 1
+
+    def stop(self, timeout: float | None = DISPATCH_STOP_TIMEOUT) -> None:
+        """Stop the dispatcher, pending states are discarded.
+
+        Waits at most timeout seconds for a running callback, unless stop is
+        called from the callback itself.
+        """
+        with self._condition:
+            self._stopped = True
+            self._queue.clear()
+            self._update_depth()
+            self._condition.notify_all()
+
+        if threading.current_thread() is not self:
+            self.join(timeout)
+            if self.is_alive():
+                _LOGGER.warning("State change callback still running after stop")
+
+    def _update_depth(self) -> None:
+        depth = len(self._queue)
+        self._statistics.queue_depth = depth
+        self._statistics.max_queue_depth = max(self._statistics.max_queue_depth, depth)
+
+
+def _merge_states(older: dict, newer: dict) -> dict:
+    """Merge two refreshStates responses, lists like changes and events are joined."""
+    merged = dict(newer)
+    for key, value in older.items():
+        if isinstance(value, list):
+            merged[key] = value + newer.get(key, [])
+    return merged
@@ -3,8 +3,13 @@
 import logging
 import threading
 
-from .common.const import REFRESH_STATE_TIMEOUT
+from .common.const import DEFAULT_DISPATCH_QUEUE_SIZE, REFRESH_STATE_TIMEOUT
 from .common.rest_client import RestClient
+from .fibaro_state_dispatcher import (
+    DispatchOverflowPolicy,
+    DispatchStatistics,
+    FibaroStateDispatcher,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,14 +19,28 @@ class FibaroStateHandler(threading.Thread):
     endpoint to pull state changes from home center.
     """
 
-    def __init__(self, rest_client: RestClient, callback: callable) -> None:
-        """Create the state handler and start the background thread."""
+    def __init__(
+        self,
+        rest_client: RestClient,
+        callback: callable,
+        queue_size: int = DEFAULT_DISPATCH_QUEUE_SIZE,
+        overflow_policy: DispatchOverflowPolicy = DispatchOverflowPolicy.COALESCE,
+        last: int = 0,
+    ) -> None:
+        """Create the state handler and start the background thread.
+
+        The rest client is owned by the state handler and closed on stop.
+        The callback is called from a separate dispatch thread, states are
+        queued in between with at most queue_size entries. Polling starts
+        at the refreshStates cursor last.
+        """
 
         super().__init__(name=f"Thread {__name__}")
 
         self._rest_client = rest_client
-        self._callback = callback
+        self._dispatcher = FibaroStateDispatcher(callback, queue_size, overflow_policy)
         self._stop_flag = threading.Event()
+        self._last = last
 
         # stop unconditionally on exit
         self.daemon = True
@@ -32,7 +51,7 @@ class FibaroStateHandler(threading.Thread):
         """State Handler main loop which runs in this thread."""
 
         _LOGGER.info("Starting the state change handler")
-        last = 0
+        last = self._last
 
         while not self._is_stopped_flag():
             sleep_time = 1
@@ -59,14 +78,15 @@ class FibaroStateHandler(threading.Thread):
                     self._stop_flag.wait(sleep_time)
 
                 if success:
-                    try:
-                        self._callback(state)
-                    except Exception as ex:
-                        _LOGGER.warning("Error in state change callback: %s", ex)
-
+                    self._dispatcher.put(state)
 
         _LOGGER.info("State change handler stopped.")
 
+    @property
+    def dispatch_statistics(self) -> DispatchStatistics:
+        """Returns the counters of the dispatch queue."""
+        return self._dispatcher.statistics
+
     def _is_stopped_flag(self) -> bool:
         return self._stop_flag.is_set()
 
@@ -74,6 +94,7 @@ class FibaroStateHandler(threading.Thread):
         """Stop the state handler."""
         _LOGGER.debug("Stopping the state change handler")
 
-        # no effect on pending request
+        # no effect on pending request, the session is only used by this handler
         self._rest_client.close()
         self._stop_flag.set()
+        self._dispatcher.stop()
@@ -3,99 +3,840 @@ provides methods to register listeners for specific devices.
 """
 
 import logging
+import threading
+import time
 from typing import Any
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Mapping
 
+from .common.const import (
+    DEVICE_CREATED_EVENT,
+    DEVICE_MODIFIED_EVENTS,
+    DEVICE_REMOVED_EVENT,
+    DEFAULT_STATE_SAVE_INTERVAL,
+)
+from .fibaro_change_filter import NumericChangeFilter, filter_listener
 from .fibaro_client import FibaroClient
 from .fibaro_device import DeviceModel
-from .fibaro_data_helper import read_devices
+from .fibaro_device_query import DeviceQuery
+from .fibaro_device_snapshot import FibaroDeviceSnapshot
+from .fibaro_device_tree import DeviceTree
+from .fibaro_data_helper import include_device, read_devices
+from .fibaro_info import InfoModel
+from .fibaro_room import RoomModel
+from .fibaro_scene import SceneModel
 from .fibaro_state_resolver import FibaroEvent, FibaroStateChange, FibaroStateResolver
+from .fibaro_state_store import FibaroStateStore
+from .fibaro_subscription_registry import Subscription, SubscriptionRegistry
 
 
 _LOGGER = logging.getLogger(__name__)
 
+DEVICE_ADDED = "added"
+DEVICE_REMOVED = "removed"
+DEVICE_MODIFIED = "modified"
+
+
+class FibaroStateBatch:
+    """All changes of one refreshStates response."""
+
+    def __init__(
+        self,
+        devices: list[DeviceModel],
+        changed_properties: dict[int, frozenset[str]],
+        events: list[FibaroEvent],
+    ) -> None:
+        """Constructor."""
+        self._devices = devices
+        self._changed_properties = changed_properties
+        self._events = events
+
+    @property
+    def devices(self) -> list[DeviceModel]:
+        """Returns the changed devices."""
+        return self._devices
+
+    @property
+    def changed_properties(self) -> dict[int, frozenset[str]]:
+        """Returns the names of the changed properties by device id."""
+        return self._changed_properties
+
+    @property
+    def events(self) -> list[FibaroEvent]:
+        """Returns all events."""
+        return self._events
+
 
 class FibaroStateMultiplexer:
     """State and event multiplexer."""
 
     def __init__(
-        self, fibaro_client: FibaroClient, include_devices_from_plugins: bool = False
+        self,
+        fibaro_client: FibaroClient,
+        include_devices_from_plugins: bool = False,
+        coalesce_window: float | None = None,
+        state_store: FibaroStateStore | None = None,
+        state_save_interval: float = DEFAULT_STATE_SAVE_INTERVAL,
+        warm_start: bool = False,
     ) -> None:
-        """Initialize the fibaro state multiplexer."""
+        """Initialize the fibaro state multiplexer.
+
+        With coalesce_window set, change listeners are notified once per device
+        with the final state instead of once per state change record. A window
+        of 0 coalesces the changes of one poll, a positive value collects the
+        changes of that many seconds.
+
+        With a state store, the refreshStates cursor and the devices are saved
+        at most every state_save_interval seconds and on stop. The next start
+        restores them and only polls the changes since the saved cursor.
+
+        warm_start additionally keeps the hub info, rooms and scenes in the
+        state store. A start with saved state then sends no request before
+        the devices are available, not even connect() is needed. Everything
+        is read again in the background and the differences of the devices
+        are reported to the device listeners. Info, rooms and scenes are
+        replaced without notification.
+        """
         self._fibaro_client = fibaro_client
         self._include_devices_from_plugins = include_devices_from_plugins
-        self._devices: dict[int, DeviceModel] = {}
+        self._snapshot = FibaroDeviceSnapshot(0, {})
+        self._device_tree = DeviceTree()
+
+        # refreshStates cursor of the last applied state, guarded by the
+        # update lock like the snapshot
+        self._last = 0
+        self._state_store = state_store
+        self._state_save_interval = state_save_interval
+        self._last_save = 0.0
+        self._save_lock = threading.Lock()
+
+        self._warm_start = warm_start
+        self._info: InfoModel | None = None
+        self._rooms: list[RoomModel] | None = None
+        self._scenes: list[SceneModel] | None = None
+        self._reconcile_thread: threading.Thread | None = None
+        # set by stop, the background reconcile then publishes nothing
+        self._stopped = threading.Event()
 
-        self._change_listeners: dict[int,
-                                     list[Callable[[DeviceModel], None]]] = {}
-        self._event_listeners: dict[int,
-                                    list[Callable[[FibaroEvent], None]]] = {}
+        self._coalesce_window = coalesce_window
+        self._pending_changes: dict[int, set[str]] = {}
+        self._pending_lock = threading.Lock()
+        self._flush_timer: threading.Timer | None = None
+        # change filters of property listeners, their pending values are
+        # dropped on stop
+        self._change_filters: set[NumericChangeFilter] = set()
+
+        # serializes writers of the device snapshot, readers don't need it
+        self._update_lock = threading.Lock()
+
+        # change and event listeners by device id, property listeners by
+        # (device id, property name), wildcard property listeners by property
+        # name, event type listeners by event type or None for all events and
+        # batch listeners with key None, device lifecycle listeners by kind of
+        # lifecycle change
+        self._change_listeners = SubscriptionRegistry()
+        self._event_listeners = SubscriptionRegistry()
+        self._event_type_listeners = SubscriptionRegistry()
+        self._property_listeners = SubscriptionRegistry()
+        self._wildcard_property_listeners = SubscriptionRegistry()
+        self._batch_listeners = SubscriptionRegistry()
+        self._device_listeners = SubscriptionRegistry()
 
     def start(self) -> None:
         """Connect push channel and load initial device state.
-        This starts change and event dispatching."""
-        self._devices = {
-            device.fibaro_id: device
-            for device in read_devices(
+        This starts change and event dispatching.
+
+        With a state store which contains a saved state, the devices are
+        restored from the store instead of being read from the hub. With
+        warm_start they are read again in the background."""
+        self._stopped.clear()
+        devices = self._restore_state()
+        if devices is None:
+            if self._warm_start:
+                self._read_topology()
+            # the cursor is read before the devices, so changes during the
+            # device read are polled again and none is lost, applying them
+            # twice has no effect
+            self._last = self._fibaro_client.read_state_cursor()
+            devices = read_devices(
                 self._fibaro_client, self._include_devices_from_plugins
             )
-        }
-        self._fibaro_client.register_update_handler(self._on_change)
+        elif self._warm_start:
+            self._reconcile_thread = threading.Thread(
+                target=self._reconcile, name=f"Thread {__name__}", daemon=True
+            )
+        with self._update_lock:
+            snapshot = FibaroDeviceSnapshot(
+                self._snapshot.version + 1,
+                {device.fibaro_id: device for device in devices},
+            )
+            self._device_tree.reset(devices, snapshot.version)
+            self._snapshot = snapshot
+        self._last_save = time.monotonic()
+        self._fibaro_client.register_update_handler(self._on_change, last=self._last)
+        if self._reconcile_thread:
+            self._reconcile_thread.start()
 
     def stop(self) -> None:
-        """Disconnect push channel so that no change and events are dispatched anymore."""
+        """Disconnect push channel so that no change and events are dispatched anymore.
+
+        The current state is saved to the state store before the devices are
+        released. A running background reconcile is stopped and awaited."""
+        self._stopped.set()
         self._fibaro_client.unregister_update_handler()
-        self._devices = {}
+        reconcile_thread = self._reconcile_thread
+        if reconcile_thread and reconcile_thread is not threading.current_thread():
+            reconcile_thread.join()
+        self._reconcile_thread = None
+        if self._snapshot.devices:
+            self._save_state()
+        with self._pending_lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending_changes = {}
+        for change_filter in self._change_filters:
+            change_filter.cancel()
+        with self._update_lock:
+            snapshot = FibaroDeviceSnapshot(self._snapshot.version + 1, {})
+            self._device_tree.reset((), snapshot.version)
+            self._snapshot = snapshot
 
     def add_change_listener(
         self, fibaro_id: int, listener: Callable[[DeviceModel], None]
-    ) -> Callable[[], None]:
+    ) -> Subscription:
         """Add a listener to get property changes."""
-        change_listeners = self._change_listeners.setdefault(fibaro_id, [])
-        change_listeners.append(listener)
+        return self._change_listeners.add(fibaro_id, listener)
 
-        return lambda: change_listeners.remove(listener)
+    def add_property_listener(
+        self,
+        fibaro_id: int | None,
+        property_name: str,
+        listener: Callable[[DeviceModel], None],
+        change_filter: NumericChangeFilter | None = None,
+    ) -> Subscription:
+        """Add a listener to get changes of one property.
+
+        With fibaro_id None, the listener gets changes of this property on
+        all devices. A change filter can be used to skip small changes of
+        numeric properties, its pending values are dropped when the listener
+        is removed.
+        """
+        on_remove = None
+        if change_filter:
+            self._change_filters.add(change_filter)
+            listener = filter_listener(property_name, change_filter, listener)
+
+            def on_remove() -> None:
+                change_filter.cancel()
+                self._change_filters.discard(change_filter)
+
+        if fibaro_id is None:
+            return self._wildcard_property_listeners.add(
+                property_name, listener, on_remove
+            )
+        return self._property_listeners.add(
+            (fibaro_id, property_name), listener, on_remove
+        )
 
     def add_event_listener(
         self, fibaro_id: int, listener: Callable[[FibaroEvent], None]
-    ) -> Callable[[], None]:
+    ) -> Subscription:
         """Add event listener."""
-        event_listeners = self._event_listeners.setdefault(fibaro_id, [])
-        event_listeners.append(listener)
+        return self._event_listeners.add(fibaro_id, listener)
+
+    def add_event_type_listener(
+        self, event_type: str | None, listener: Callable[[FibaroEvent], None]
+    ) -> Subscription:
+        """Add a listener for all events of one type, for example
+        "CentralSceneEvent", independent of the device.
+
+        With event_type None the listener gets all events, including events
+        which are not related to a device.
+        """
+        return self._event_type_listeners.add(event_type, listener)
 
-        return lambda: event_listeners.remove(listener)
+    def add_batch_listener(
+        self, listener: Callable[[FibaroStateBatch], None]
+    ) -> Subscription:
+        """Add a listener which gets all changed devices and events of one
+        refreshStates response in one call."""
+        return self._batch_listeners.add(None, listener)
+
+    def add_device_added_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add a listener for devices added on the hub after start."""
+        return self._device_listeners.add(DEVICE_ADDED, listener)
+
+    def add_device_removed_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add a listener for removed devices, it gets the last known device state."""
+        return self._device_listeners.add(DEVICE_REMOVED, listener)
+
+    def add_device_modified_listener(
+        self, listener: Callable[[DeviceModel], None]
+    ) -> Subscription:
+        """Add a listener for devices whose definition was changed on the hub,
+        for example the name or the room."""
+        return self._device_listeners.add(DEVICE_MODIFIED, listener)
+
+    def get_listener_counts(self) -> dict[int, int]:
+        """Return the number of change, property and event listeners per device id.
+
+        Devices without listeners are not contained.
+        """
+        counts: dict[int, int] = {}
+        for fibaro_id, count in self._change_listeners.counts().items():
+            counts[fibaro_id] = counts.get(fibaro_id, 0) + count
+        for (fibaro_id, _), count in self._property_listeners.counts().items():
+            counts[fibaro_id] = counts.get(fibaro_id, 0) + count
+        for fibaro_id, count in self._event_listeners.counts().items():
+            counts[fibaro_id] = counts.get(fibaro_id, 0) + count
+        return counts
+
+    def resync_devices(self, fibaro_ids: Iterable[int]) -> None:
+        """Read the given devices again and apply the differences.
+
+        Each device costs one small request instead of a full reload. Changed
+        properties are reported to the change listeners, added, removed and
+        otherwise modified devices to the device listeners.
+        """
+        # the devices are read before the update lock is taken
+        fetched_devices = self._fetch_devices(fibaro_ids)
+        with self._update_lock:
+            snapshot = self._snapshot
+            devices = dict(snapshot.devices)
+            updated_devices: list[DeviceModel] = []
+            lifecycle_changes: list[tuple[str, DeviceModel]] = []
+
+            for fibaro_id, device in fetched_devices.items():
+                self._apply_device(devices, fibaro_id, device)
+            _collect_lifecycle_changes(
+                snapshot.devices,
+                devices,
+                fetched_devices,
+                updated_devices,
+                lifecycle_changes,
+            )
+
+            if updated_devices or lifecycle_changes:
+                self._publish(snapshot, devices, updated_devices, lifecycle_changes)
+
+        self._notify_device_changes(updated_devices, lifecycle_changes)
+
+    def get_info(self) -> InfoModel:
+        """Return the hub info, with warm_start the info known at start."""
+        return self._info or self._fibaro_client.read_info()
+
+    def get_rooms(self) -> list[RoomModel]:
+        """Return the rooms, with warm_start the rooms known at start."""
+        if self._rooms is None:
+            return self._fibaro_client.read_rooms()
+        return list(self._rooms)
+
+    def get_scenes(self) -> list[SceneModel]:
+        """Return the scenes, with warm_start the scenes known at start."""
+        if self._scenes is None:
+            return self._fibaro_client.read_scenes()
+        return list(self._scenes)
 
     def get_devices(self) -> list[DeviceModel]:
         """Return the current device state."""
-        return list(self._devices.values())
+        return list(self._snapshot.devices.values())
+
+    def find_devices(self, query: DeviceQuery) -> list[DeviceModel]:
+        """Return the current devices matching the query, see
+        FibaroDeviceSnapshot.find()."""
+        return self._snapshot.find(query)
+
+    def get_device_tree(self) -> DeviceTree:
+        """Return the parent and child relations of the current devices.
+
+        The same tree is kept over stop and start and is updated with every
+        change, also the main devices which are resolved from it. It is
+        updated right before a new snapshot is published, its version is
+        the version of the snapshot it reflects."""
+        return self._device_tree
+
+    def get_snapshot(self) -> FibaroDeviceSnapshot:
+        """Return the current device state as consistent, immutable snapshot.
+
+        Devices in a snapshot are never modified, changes are published as a
+        new snapshot with a higher version.
+        """
+        return self._snapshot
 
     def _on_change(self, state: Any) -> None:
-        # update internal device model and notify registered listeners
+        # apply the changes on a copy of the device state, publish it as new
+        # snapshot and notify registered listeners
+        last = state.get("last") if isinstance(state, dict) else None
+        if isinstance(last, int) and last < self._last:
+            # the hub started counting again, for example after a reboot, so
+            # the changes since the known cursor are lost
+            _LOGGER.info(
+                "refreshStates cursor went back from %s to %s, read all devices",
+                self._last,
+                last,
+            )
+            self._resync_all_devices()
+
         resolver = FibaroStateResolver(state)
+        events = resolver.get_events()
+        # devices of lifecycle events are read before the update lock is
+        # taken, snapshot readers and writers never wait for the hub
+        fetched_devices = self._fetch_devices(
+            event.fibaro_id
+            for event in events
+            if self._is_lifecycle_event(event)
+            and event.event_type != DEVICE_REMOVED_EVENT
+        )
+        with self._update_lock:
+            snapshot, updated_devices, lifecycle_changes = self._apply_changes(
+                resolver.get_state_updates(), events, fetched_devices
+            )
+            if isinstance(last, int):
+                self._last = last
+        batch_changes: dict[int, set[str]] = {}
+        for updated_device in updated_devices:
+            batch_changes.setdefault(updated_device.fibaro_id, set()).update(
+                updated_device.changed_properties
+            )
 
-        for state_change in resolver.get_state_updates():
-            fibaro_id = state_change.fibaro_id
-            device = self._devices.get(fibaro_id)
-            if device:
-                self._update_device_data(device, state_change)
-                for listener in self._change_listeners.get(fibaro_id, []):
-                    listener(device)
+        self._notify_device_changes(updated_devices, lifecycle_changes)
 
-        for event in resolver.get_events():
+        for event in events:
             # event does not always have a fibaro id, therefore it is
             # essential that we first check for it
             fibaro_id = event.fibaro_id
             if fibaro_id:
-                for listener in self._event_listeners.get(fibaro_id, []):
+                for listener in self._event_listeners.get(fibaro_id):
                     listener(event)
+            for listener in self._event_type_listeners.get(event.event_type):
+                listener(event)
+            for listener in self._event_type_listeners.get(None):
+                listener(event)
+
+        if self._batch_listeners.has_key(None) and (batch_changes or events):
+            self._notify_batch_listeners(snapshot, batch_changes, events)
+
+        if (
+            self._state_store
+            and time.monotonic() - self._last_save >= self._state_save_interval
+        ):
+            self._save_state()
+
+    def _restore_state(self) -> list[DeviceModel] | None:
+        # returns the devices of the state store and sets the cursor or
+        # returns None if there is no usable saved state
+        if self._state_store is None:
+            return None
+        try:
+            data = self._state_store.load()
+            if not data:
+                return None
+            if self._warm_start:
+                # the info must be restored first, it contains the api version
+                info = self._fibaro_client.restore_info(data["info"])
+                rooms = self._fibaro_client.create_rooms(data["rooms"])
+                scenes = self._fibaro_client.create_scenes(data["scenes"])
+            devices = self._fibaro_client.create_devices(data["devices"])
+            last = int(data["last"])
+        except Exception as ex:
+            _LOGGER.warning("Could not restore saved state: %s", ex)
+            return None
+
+        if self._warm_start:
+            self._info, self._rooms, self._scenes = (info, rooms, scenes)
+        self._last = last
+        _LOGGER.debug("Restored %s devices at cursor %s", len(devices), last)
+        return [
+            device
+            for device in devices
+            if include_device(device, self._include_devices_from_plugins)
+        ]
+
+    def _read_topology(self) -> None:
+        # the info is the first request, it also provides the api version
+        # when the client was not connected before
+        info = self._fibaro_client.read_info()
+        self._fibaro_client.restore_info(info.raw_data)
+        rooms = self._fibaro_client.read_rooms()
+        scenes = self._fibaro_client.read_scenes()
+        if not self._stopped.is_set():
+            self._info, self._rooms, self._scenes = (info, rooms, scenes)
+
+    def _reconcile(self) -> None:
+        # replace the restored state with the current state of the hub, only
+        # the device differences are reported
+        try:
+            self._read_topology()
+        except Exception as ex:
+            _LOGGER.warning("Could not read hub info, rooms and scenes: %s", ex)
+            return
+        self._resync_all_devices()
+        if not self._stopped.is_set():
+            self._save_state()
+
+    def _resync_all_devices(self) -> None:
+        # read all devices and apply the differences to the known devices,
+        # devices changed by the push channel during the read are newer
+        # than the read data and are kept
+        read_snapshot = self._snapshot
+        try:
+            current_devices = read_devices(
+                self._fibaro_client, self._include_devices_from_plugins
+            )
+        except Exception as ex:
+            _LOGGER.warning("Could not read devices: %s", ex)
+            return
+
+        with self._update_lock:
+            if self._stopped.is_set():
+                # stop() released the devices during the read
+                return
+            snapshot = self._snapshot
+            devices = dict(snapshot.devices)
+            updated_devices: list[DeviceModel] = []
+            lifecycle_changes: list[tuple[str, DeviceModel]] = []
+            read_ids = {device.fibaro_id for device in current_devices}
+
+            for fibaro_id, known_device in snapshot.devices.items():
+                if (
+                    fibaro_id not in read_ids
+                    and known_device is read_snapshot.get(fibaro_id)
+                ):
+                    del devices[fibaro_id]
+                    lifecycle_changes.append((DEVICE_REMOVED, known_device))
+            for device in current_devices:
+                fibaro_id = device.fibaro_id
+                known_device = snapshot.get(fibaro_id)
+                if known_device is not read_snapshot.get(fibaro_id):
+                    continue
+                devices[fibaro_id] = device
+                if known_device is None:
+                    lifecycle_changes.append((DEVICE_ADDED, device))
+                else:
+                    _collect_modification(
+                        known_device, device, updated_devices, lifecycle_changes
+                    )
+
+            if updated_devices or lifecycle_changes:
+                self._publish(snapshot, devices, updated_devices, lifecycle_changes)
+
+        self._notify_device_changes(updated_devices, lifecycle_changes)
+
+    def _save_state(self) -> None:
+        if self._state_store is None:
+            return
+        with self._update_lock:
+            snapshot = self._snapshot
+            last = self._last
+        data = {
+            "last": last,
+            "devices": [device.raw_data for device in snapshot.devices.values()],
+        }
+        if self._warm_start and self._info:
+            data["info"] = self._info.raw_data
+            data["rooms"] = [room.raw_data for room in self._rooms]
+            data["scenes"] = [scene.raw_data for scene in self._scenes]
+
+        # file I/O is done without the update lock, saves are serialized
+        with self._save_lock:
+            self._last_save = time.monotonic()
+            try:
+                self._state_store.save(data)
+            except Exception as ex:
+                _LOGGER.warning("Could not save state: %s", ex)
+
+    def _apply_changes(
+        self,
+        state_changes: list[FibaroStateChange],
+        events: list[FibaroEvent],
+        fetched_devices: dict[int, DeviceModel | None],
+    ) -> tuple[FibaroDeviceSnapshot, list[DeviceModel], list[tuple[str, DeviceModel]]]:
+        # must be called with the update lock held, fetched_devices contains
+        # the devices of the lifecycle events read by _fetch_devices()
+        snapshot = self._snapshot
+        devices: dict[int, DeviceModel] | None = None
+        updated_devices: list[DeviceModel] = []
+
+        for state_change in state_changes:
+            fibaro_id = state_change.fibaro_id
+            device = (devices if devices is not None else snapshot.devices).get(
+                fibaro_id
+            )
+            if device:
+                updated_device = self._update_device_data(device, state_change)
+                if updated_device is None:
+                    continue
+                if devices is None:
+                    devices = dict(snapshot.devices)
+                devices[fibaro_id] = updated_device
+                updated_devices.append(updated_device)
+
+        lifecycle_ids: dict[int, None] = {}
+        for event in events:
+            if self._is_lifecycle_event(event):
+                if devices is None:
+                    devices = dict(snapshot.devices)
+                if self._apply_lifecycle_event(devices, event, fetched_devices):
+                    lifecycle_ids[event.fibaro_id] = None
+
+        # devices which were read again or removed replace their property
+        # changes of this poll, they are compared with the state before the
+        # poll like in resync_devices()
+        lifecycle_changes: list[tuple[str, DeviceModel]] = []
+        if lifecycle_ids:
+            updated_devices = [
+                device
+                for device in updated_devices
+                if device.fibaro_id not in lifecycle_ids
+            ]
+            _collect_lifecycle_changes(
+                snapshot.devices,
+                devices,
+                lifecycle_ids,
+                updated_devices,
+                lifecycle_changes,
+            )
+
+        if updated_devices or lifecycle_changes:
+            snapshot = self._publish(
+                snapshot, devices, updated_devices, lifecycle_changes
+            )
+        return (snapshot, updated_devices, lifecycle_changes)
+
+    def _publish(
+        self,
+        snapshot: FibaroDeviceSnapshot,
+        devices: dict[int, DeviceModel],
+        updated_devices: list[DeviceModel],
+        lifecycle_changes: list[tuple[str, DeviceModel]],
+    ) -> FibaroDeviceSnapshot:
+        # must be called with the update lock held, updates the device tree
+        # and publishes the devices as next snapshot version
+        changed_ids = [device.fibaro_id for _, device in lifecycle_changes]
+        new_snapshot = snapshot.updated(devices, changed_ids)
+        # the tree gets the final state of each device of this update
+        tree_ids = dict.fromkeys(changed_ids)
+        tree_ids.update(dict.fromkeys(device.fibaro_id for device in updated_devices))
+        self._device_tree.apply(
+            new_snapshot.version,
+            [devices[fibaro_id] for fibaro_id in tree_ids if fibaro_id in devices],
+            [fibaro_id for fibaro_id in tree_ids if fibaro_id not in devices],
+        )
+        self._snapshot = new_snapshot
+        return new_snapshot
+
+    def _notify_device_changes(
+        self,
+        updated_devices: list[DeviceModel],
+        lifecycle_changes: list[tuple[str, DeviceModel]],
+    ) -> None:
+        for kind, device in lifecycle_changes:
+            for listener in self._device_listeners.get(kind):
+                listener(device)
+
+        for updated_device in updated_devices:
+            if self._coalesce_window is None:
+                self._notify_change_listeners(updated_device)
+            else:
+                self._add_pending_change(
+                    updated_device.fibaro_id, updated_device.changed_properties
+                )
+
+        if self._coalesce_window == 0:
+            self._flush_pending_changes()
+
+    def _is_lifecycle_event(self, event: FibaroEvent) -> bool:
+        return event.fibaro_id is not None and (
+            event.event_type in (DEVICE_CREATED_EVENT, DEVICE_REMOVED_EVENT)
+            or event.event_type in DEVICE_MODIFIED_EVENTS
+        )
+
+    def _apply_lifecycle_event(
+        self,
+        devices: dict[int, DeviceModel],
+        event: FibaroEvent,
+        fetched_devices: dict[int, DeviceModel | None],
+    ) -> bool:
+        # update the device map with the device which was read again,
+        # returns False if the read failed and the known device is kept
+        fibaro_id = event.fibaro_id
+        if event.event_type == DEVICE_REMOVED_EVENT:
+            self._apply_device(devices, fibaro_id, None)
+            return True
+        if fibaro_id not in fetched_devices:
+            return False
+        self._apply_device(devices, fibaro_id, fetched_devices[fibaro_id])
+        return True
+
+    def _fetch_devices(
+        self, fibaro_ids: Iterable[int]
+    ) -> dict[int, DeviceModel | None]:
+        # read the devices from the hub, must be called without the update
+        # lock. None marks a device which is gone or not included, devices
+        # which could not be read are missing.
+        fetched_devices: dict[int, DeviceModel | None] = {}
+        for fibaro_id in dict.fromkeys(fibaro_ids):
+            try:
+                device = self._fibaro_client.read_device(fibaro_id)
+            except Exception as ex:
+                _LOGGER.warning("Could not read device %s: %s", fibaro_id, ex)
+                continue
+            if device and not include_device(
+                device, self._include_devices_from_plugins
+            ):
+                device = None
+            fetched_devices[fibaro_id] = device
+        return fetched_devices
+
+    def _apply_device(
+        self,
+        devices: dict[int, DeviceModel],
+        fibaro_id: int,
+        device: DeviceModel | None,
+    ) -> None:
+        # put the device which was read again into the device map, None
+        # removes the known device
+        if device is None:
+            if devices.pop(fibaro_id, None) is not None:
+                _LOGGER.debug("Device %s removed", fibaro_id)
+            return
+
+        devices[fibaro_id] = device
+        _LOGGER.debug("Device %s read again", fibaro_id)
+
+    def _notify_batch_listeners(
+        self,
+        snapshot: FibaroDeviceSnapshot,
+        batch_changes: dict[int, set[str]],
+        events: list[FibaroEvent],
+    ) -> None:
+        batch = FibaroStateBatch(
+            [snapshot.devices[fibaro_id] for fibaro_id in batch_changes],
+            {
+                fibaro_id: frozenset(changed_properties)
+                for fibaro_id, changed_properties in batch_changes.items()
+            },
+            events,
+        )
+        for listener in self._batch_listeners.get(None):
+            listener(batch)
+
+    def _notify_change_listeners(self, device: DeviceModel) -> None:
+        fibaro_id = device.fibaro_id
+        changed_properties = device.changed_properties
+        for listener in self._change_listeners.get(fibaro_id):
+            listener(device)
+
+        for property_name in changed_properties:
+            for listener in self._property_listeners.get((fibaro_id, property_name)):
+                listener(device)
+            for listener in self._wildcard_property_listeners.get(property_name):
+                listener(device)
+
+    def _add_pending_change(
+        self, fibaro_id: int, changed_properties: frozenset[str]
+    ) -> None:
+        # collect the changes of one device until the pending changes are flushed
+        with self._pending_lock:
+            self._pending_changes.setdefault(fibaro_id, set()).update(changed_properties)
+            if self._coalesce_window and self._flush_timer is None:
+                self._flush_timer = threading.Timer(
+                    self._coalesce_window, self._flush_pending_changes
+                )
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def _flush_pending_changes(self) -> None:
+        with self._pending_lock:
+            pending_changes = self._pending_changes
+            self._pending_changes = {}
+            self._flush_timer = None
+
+        snapshot = self._snapshot
+        for fibaro_id, changed_properties in pending_changes.items():
+            device = snapshot.get(fibaro_id)
+            if device:
+                if device.changed_properties != changed_properties:
+                    # report all changes since the last flush without
+                    # modifying the published device
+                    device = device.updated({})
+                    device.changed_properties = frozenset(changed_properties)
+                self._notify_change_listeners(device)
 
     def _update_device_data(
         self, device: DeviceModel, state_change: FibaroStateChange
-    ) -> None:
-        # update the internal data object to keep it always current
+    ) -> DeviceModel | None:
+        # return an updated copy of the device with the properties which
+        # really changed or None if nothing changed
+        properties = device.properties
+        property_changes = {}
         for key, value in state_change.property_changes.items():
-            device.properties[key] = value
+            if key in properties and properties[key] == value:
+                continue
+            property_changes[key] = value
             _LOGGER.debug(
                 "New state %s[%s].%s = %s", device.name, device.fibaro_id, key, str(
                     value)
             )
+        if not property_changes:
+            return None
+        return device.updated(property_changes)
+
+
+def _collect_lifecycle_changes(
+    known_devices: Mapping[int, DeviceModel],
+    devices: dict[int, DeviceModel],
+    fibaro_ids: Iterable[int],
+    updated_devices: list[DeviceModel],
+    lifecycle_changes: list[tuple[str, DeviceModel]],
+) -> None:
+    """Compare the devices which were read again or removed with the known
+    devices.
+
+    New and missing devices are reported as added and removed, the others
+    by _collect_modification(). A device which was read again without any
+    difference is replaced by the known device.
+    """
+    for fibaro_id in fibaro_ids:
+        known_device = known_devices.get(fibaro_id)
+        device = devices.get(fibaro_id)
+        if device is None:
+            if known_device is not None:
+                lifecycle_changes.append((DEVICE_REMOVED, known_device))
+        elif known_device is None:
+            lifecycle_changes.append((DEVICE_ADDED, device))
+        elif device is not known_device:
+            change_count = len(updated_devices) + len(lifecycle_changes)
+            _collect_modification(
+                known_device, device, updated_devices, lifecycle_changes
+            )
+            if len(updated_devices) + len(lifecycle_changes) == change_count:
+                devices[fibaro_id] = known_device
+
+
+def _collect_modification(
+    known_device: DeviceModel,
+    device: DeviceModel,
+    updated_devices: list[DeviceModel],
+    lifecycle_changes: list[tuple[str, DeviceModel]],
+) -> None:
+    """Compare a device which was read again with the known device.
+
+    Changed properties are reported as property change, other changes as
+    modified device.
+    """
+    changed_properties = _changed_keys(known_device.properties, device.properties)
+    if changed_properties:
+        device.changed_properties = frozenset(changed_properties)
+        updated_devices.append(device)
+    if _changed_keys(known_device.raw_data, device.raw_data) - {"properties"}:
+        lifecycle_changes.append((DEVICE_MODIFIED, device))
+
+
+def _changed_keys(old: dict, new: dict) -> set[str]:
+    """Returns the keys which were added, removed or have a different value."""
+    return {key for key in old.keys() | new.keys() if old.get(key) != new.get(key)}
@@ -0,0 +1,71 @@
+"""Persistent store for the state of the state multiplexer."""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+# Version of the stored data format, stored data of other versions is ignored
+STORE_FORMAT_VERSION = 1
+
+
+class FibaroStateStore(ABC):
+    """Base class of a persistent store for the refreshStates cursor and
+    the raw data of the last known devices.
+
+    Implement load() and save() to use another backend than a local file.
+    """
+
+    @abstractmethod
+    def load(self) -> dict[str, Any] | None:
+        """Returns the stored data or None if nothing is stored."""
+
+    @abstractmethod
+    def save(self, data: dict[str, Any]) -> None:
+        """Store the data, replacing previously stored data."""
+
+
+class FibaroFileStateStore(FibaroStateStore):
+    """Store the state as compact json in a local file."""
+
+    def __init__(self, path: str) -> None:
+        """Constructor."""
+        self._path = path
+
+    def load(self) -> dict[str, Any] | None:
+        """Returns the stored data or None if the file is missing or invalid."""
+        try:
+            with open(self._path, encoding="UTF-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as ex:
+            _LOGGER.warning("Cannot read stored state %s: %s", self._path, ex)
+            return None
+
+        if not isinstance(data, dict) or data.get("version") != STORE_FORMAT_VERSION:
+            _LOGGER.info("Ignore stored state %s with unknown format", self._path)
+            return None
+        return data
+
+    def save(self, data: dict[str, Any]) -> None:
+        """Write the data to a temporary file and replace the file atomically."""
+        directory = os.path.dirname(os.path.abspath(self._path))
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(file_descriptor, "w", encoding="UTF-8") as file:
+                json.dump(
+                    {**data, "version": STORE_FORMAT_VERSION},
+                    file,
+                    separators=(",", ":"),
+                )
+            os.replace(temp_path, self._path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
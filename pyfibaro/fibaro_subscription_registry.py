@@ -0,0 +1,122 @@
+"""Registry for listeners which are registered by a key like the device id."""
+
+from __future__ import annotations
+
+from collections.abc import Callable, Hashable
+from typing import Any
+
+
+class Subscription:
+    """Handle of a registered listener.
+
+    Calling the handle unregisters the listener, so it can be used as the
+    unregister callback returned by the add listener methods. on_remove is
+    called once when the listener is unregistered by its handle.
+    """
+
+    def __init__(
+        self,
+        registry: SubscriptionRegistry,
+        key: Hashable,
+        listener: Callable,
+        on_remove: Callable[[], None] | None = None,
+    ) -> None:
+        """Constructor."""
+        self._registry = registry
+        self._key = key
+        self._listener = listener
+        self._on_remove = on_remove
+
+    @property
+    def key(self) -> Hashable:
+        """Returns the key the listener is registered for."""
+        return self._key
+
+    @property
+    def listener(self) -> Callable:
+        """Returns the registered listener."""
+        return self._listener
+
+    @property
+    def active(self) -> bool:
+        """Returns true as long as the listener is registered."""
+        return self._registry.contains(self)
+
+    def remove(self) -> None:
+        """Unregister the listener. Removing twice has no effect."""
+        self._registry.remove(self)
+        on_remove, self._on_remove = self._on_remove, None
+        if on_remove:
+            on_remove()
+
+    def __call__(self) -> None:
+        """Unregister the listener."""
+        self.remove()
+
+
+class SubscriptionRegistry:
+    """Listeners grouped by key.
+
+    Each registration gets its own handle, so the same callable can be
+    registered more than once and is removed in O(1) by its handle. Keys
+    without listeners are removed.
+    """
+
+    def __init__(self) -> None:
+        """Constructor."""
+        self._buckets: dict[Hashable, dict[Subscription, Callable]] = {}
+
+    def add(
+        self,
+        key: Hashable,
+        listener: Callable,
+        on_remove: Callable[[], None] | None = None,
+    ) -> Subscription:
+        """Register a listener for the key and return its handle.
+
+        on_remove is called when the handle unregisters the listener, for
+        example to release resources of the listener.
+        """
+        subscription = Subscription(self, key, listener, on_remove)
+        self._buckets.setdefault(key, {})[subscription] = listener
+        return subscription
+
+    def remove(self, subscription: Subscription) -> None:
+        """Unregister the listener of the handle."""
+        bucket = self._buckets.get(subscription.key)
+        if bucket is None or bucket.pop(subscription, None) is None:
+            return
+        if not bucket:
+            del self._buckets[subscription.key]
+
+    def contains(self, subscription: Subscription) -> bool:
+        """Returns true if the handle is registered."""
+        return subscription in self._buckets.get(subscription.key, {})
+
+    def get(self, key: Hashable) -> list[Callable]:
+        """Returns the listeners of the key.
+
+        The result is a copy, so listeners may unregister while being called.
+        """
+        bucket = self._buckets.get(key)
+        return list(bucket.values()) if bucket else []
+
+    def has_key(self, key: Hashable) -> bool:
+        """Returns true if there is a listener for the key."""
+        return key in self._buckets
+
+    def count(self, key: Hashable) -> int:
+        """Returns the number of listeners of the key."""
+        return len(self._buckets.get(key, ()))
+
+    def counts(self) -> dict[Any, int]:
+        """Returns the number of listeners per key."""
+        return {key: len(bucket) for key, bucket in self._buckets.items()}
+
+    def clear(self) -> None:
+        """Unregister all listeners."""
+        self._buckets = {}
+
+    def __len__(self) -> int:
+        """Returns the total number of listeners."""
+        return sum(len(bucket) for bucket in self._buckets.values())
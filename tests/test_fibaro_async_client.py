@@ -0,0 +1,160 @@
+"""Test AsyncFibaroClient against a local HTTP stand-in of the hub."""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from pyfibaro.fibaro_async_client import AsyncFibaroClient
+from pyfibaro.fibaro_client import FibaroAuthenticationFailed, FibaroConnectFailed
+
+from .test_utils import TEST_PASSWORD, TEST_USERNAME, load_fixture
+
+login_payload = load_fixture("login_success.json")
+info_payload = load_fixture("info.json")
+room_payload = load_fixture("room.json")
+scene_payload = load_fixture("scene.json")
+device_payload = load_fixture("device.json")
+refresh_payload = load_fixture("refresh.json")
+
+
+def _hub_app(requests: list[str], login_status: int = 200) -> web.Application:
+    """Create a minimal stand-in for the hub API which records all requests."""
+
+    def json_route(payload, status=200):
+        async def handler(request: web.Request) -> web.Response:
+            requests.append(f"{request.method} {request.path_qs}")
+            return web.json_response(payload, status=status)
+
+        return handler
+
+    async def action(request: web.Request) -> web.Response:
+        requests.append(f"{request.method} {request.path_qs}")
+        return web.Response()
+
+    app = web.Application()
+    app.router.add_get("/api/loginStatus", json_route(login_payload, login_status))
+    app.router.add_get("/api/settings/info", json_route(info_payload))
+    app.router.add_get("/api/rooms", json_route(room_payload))
+    app.router.add_get("/api/scenes", json_route(scene_payload))
+    app.router.add_get("/api/devices", json_route(device_payload))
+    app.router.add_get("/api/devices/13", json_route(device_payload[3]))
+    app.router.add_get("/api/refreshStates", json_route(refresh_payload))
+    app.router.add_post("/api/devices/{id}/action/{action}", action)
+    app.router.add_post("/api/scenes/{id}/action/{action}", action)
+    return app
+
+
+def _run_with_hub(test, login_status: int = 200) -> list[str]:
+    """Run the test coroutine against a fresh hub stand-in."""
+    requests: list[str] = []
+
+    async def runner() -> None:
+        server = TestServer(_hub_app(requests, login_status))
+        await server.start_server()
+        client = AsyncFibaroClient(str(server.make_url("/api/")))
+        try:
+            await test(client)
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+    return requests
+
+
+def test_async_connect_and_read() -> None:
+    """Test connect and read endpoints."""
+
+    async def test(client: AsyncFibaroClient) -> None:
+        client.set_authentication(TEST_USERNAME, TEST_PASSWORD)
+        assert await client.connect() is True
+
+        info = await client.read_info()
+        assert info.serial_number == info_payload["serialNumber"]
+        assert len(await client.read_rooms()) == len(room_payload)
+        assert len(await client.read_scenes()) == 2
+        assert len(await client.read_devices()) > 0
+        assert (await client.read_device(13)).fibaro_id == 13
+        assert await client.read_device(99) is None
+
+    requests = _run_with_hub(test)
+    assert requests[:2] == ["GET /api/loginStatus", "GET /api/settings/info"]
+
+
+def test_async_load_all() -> None:
+    """Test reading all startup endpoints concurrently."""
+
+    async def test(client: AsyncFibaroClient) -> None:
+        hub_data = await client.load_all()
+
+        assert hub_data.login.is_logged_in is True
+        assert len(hub_data.rooms) == len(room_payload)
+        assert len(hub_data.scenes) == 2
+        assert len(hub_data.devices) > 0
+        assert set(hub_data.timings) == {"login", "info", "rooms", "scenes", "devices"}
+
+    requests = _run_with_hub(test)
+    assert len(requests) == 5
+
+
+def test_async_invalid_authentication() -> None:
+    """Test invalid password."""
+
+    async def test(client: AsyncFibaroClient) -> None:
+        with pytest.raises(FibaroAuthenticationFailed):
+            await client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+
+    _run_with_hub(test, login_status=403)
+
+
+def test_async_connect_failed() -> None:
+    """Test server error."""
+
+    async def test(client: AsyncFibaroClient) -> None:
+        with pytest.raises(FibaroConnectFailed):
+            await client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+
+    _run_with_hub(test, login_status=500)
+
+
+def test_async_concurrent_actions() -> None:
+    """Test many concurrent device and scene actions on one loop."""
+
+    async def test(client: AsyncFibaroClient) -> None:
+        await client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+        devices = await client.read_devices()
+        scenes = await client.read_scenes()
+
+        await asyncio.gather(
+            *[device.execute_action("turnOn") for device in devices],
+            scenes[0].start(),
+        )
+
+    requests = _run_with_hub(test)
+    assert len([r for r in requests if r.endswith("/action/turnOn")]) > 1
+    assert "POST /api/scenes/2/action/start" in requests
+
+
+def test_async_refresh_states() -> None:
+    """Test the refreshStates long-poll with a coroutine callback."""
+    received = []
+
+    async def test(client: AsyncFibaroClient) -> None:
+        await client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+
+        async def callback(state) -> None:
+            received.append(state)
+
+        client.register_update_handler(callback)
+        with pytest.raises(Exception):
+            client.register_update_handler(callback)
+        while len(received) < 2:
+            await asyncio.sleep(0.01)
+        await client.unregister_update_handler()
+
+    requests = _run_with_hub(test)
+    assert received[0] == refresh_payload
+    assert "GET /api/refreshStates?last=0" in requests
+    assert f"GET /api/refreshStates?last={refresh_payload['last']}" in requests
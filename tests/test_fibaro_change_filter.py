@@ -0,0 +1,109 @@
+"""Test NumericChangeFilter class."""
+
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from pyfibaro.fibaro_change_filter import NumericChangeFilter, filter_listener
+from pyfibaro.fibaro_device import DeviceModel
+
+
+def test_absolute_deadband() -> None:
+    """Test absolute deadband."""
+    change_filter = NumericChangeFilter(absolute_deadband=1.0)
+
+    assert change_filter.accept(1, 230.0)
+    assert not change_filter.accept(1, 230.5)
+    assert not change_filter.accept(1, 229.1)
+    assert change_filter.accept(1, 231.5)
+    # state is kept per device
+    assert change_filter.accept(2, 230.5)
+
+
+def test_relative_deadband() -> None:
+    """Test relative deadband."""
+    change_filter = NumericChangeFilter(relative_deadband=0.1)
+
+    assert change_filter.accept(1, 100.0)
+    assert not change_filter.accept(1, 109.0)
+    assert change_filter.accept(1, 111.0)
+
+
+def test_min_interval_and_max_silence() -> None:
+    """Test time based limits."""
+    change_filter = NumericChangeFilter(
+        absolute_deadband=5.0, min_interval=1.0, max_silence=10.0
+    )
+
+    with patch("pyfibaro.fibaro_change_filter.time.monotonic") as monotonic:
+        monotonic.return_value = 100.0
+        assert change_filter.accept(1, 1.0)
+        monotonic.return_value = 100.5
+        assert not change_filter.accept(1, 50.0)
+        monotonic.return_value = 102.0
+        assert not change_filter.accept(1, 2.0)
+        monotonic.return_value = 111.0
+        assert change_filter.accept(1, 2.0)
+
+
+def test_filter_listener() -> None:
+    """Test listener wrapper evaluates the property value."""
+    listener = Mock()
+    filtered = filter_listener(
+        "power", NumericChangeFilter(absolute_deadband=1.0), listener
+    )
+
+    device = DeviceModel({"id": 5, "properties": {"power": "10.0"}}, Mock(), 5)
+    filtered(device)
+    device.properties["power"] = "10.4"
+    filtered(device)
+    device.properties["power"] = "unknown"
+    filtered(device)
+
+    assert listener.call_count == 2
+
+
+def test_min_interval_delivers_last_value_of_burst() -> None:
+    """Test the last value of a burst is delivered when min_interval expired."""
+    delivered = threading.Event()
+    listener = Mock(side_effect=lambda device: delivered.set())
+    filtered = filter_listener(
+        "power", NumericChangeFilter(min_interval=0.05), listener
+    )
+
+    for power in ("10.0", "20.0", "30.0"):
+        filtered(DeviceModel({"id": 5, "properties": {"power": power}}, Mock(), 5))
+    assert listener.call_count == 1
+    delivered.clear()
+
+    assert delivered.wait(2.0)
+    assert listener.call_count == 2
+    assert listener.call_args[0][0].properties["power"] == "30.0"
+
+
+def test_max_silence_delivers_pending_value() -> None:
+    """Test a value within the deadband is delivered after max_silence."""
+    change_filter = NumericChangeFilter(absolute_deadband=5.0, max_silence=0.5)
+    delivered = threading.Event()
+    deliver = Mock(side_effect=delivered.set)
+
+    assert change_filter.accept(1, 1.0, deliver)
+    assert not change_filter.accept(1, 2.0, deliver)
+
+    assert delivered.wait(2.0)
+    deliver.assert_called_once()
+    # the delivered value is the new reference for the deadband
+    assert not change_filter.accept(1, 6.5)
+
+
+def test_cancel_drops_pending_value() -> None:
+    """Test cancel() drops pending values."""
+    change_filter = NumericChangeFilter(min_interval=0.05)
+    deliver = Mock()
+
+    assert change_filter.accept(1, 1.0, deliver)
+    assert not change_filter.accept(1, 2.0, deliver)
+    change_filter.cancel()
+    time.sleep(0.1)
+
+    deliver.assert_not_called()
@@ -1,9 +1,16 @@
 """Test fibaro connection."""
 
+import threading
+import time
+from unittest.mock import patch
+
 import pytest
 import requests_mock
+from requests import HTTPError
 
+from pyfibaro.common.const import STATE_CURSOR_TIMEOUT
 from pyfibaro.fibaro_client import FibaroClient
+from pyfibaro.fibaro_device import DeviceModel
 from pyfibaro.fibaro_client import (
     FibaroAuthenticationFailed,
     FibaroConnectFailed
@@ -78,3 +85,185 @@ def test_frontend_url() -> None:
     """Test frontend url getter."""
     client = FibaroClient(TEST_BASE_URL)
     assert client.frontend_url() == TEST_BASE_URL.removesuffix("/api/")
+
+
+def test_execute_actions() -> None:
+    """Test bulk actions report per item results and errors."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/1/action/turnOn", json={"id": 1})
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/2/action/setValue", json={"id": 2})
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/3/action/turnOn", status_code=500)
+
+        client = FibaroClient(TEST_BASE_URL)
+        results = client.execute_actions(
+            [(1, "turnOn", None), (2, "setValue", [50]), (3, "turnOn", None)]
+        )
+
+        assert [result.fibaro_id for result in results] == [1, 2, 3]
+        assert results[0].success and results[0].result == {"id": 1}
+        assert results[1].success
+        assert {"args": [50]} in [r.json() for r in mock.request_history]
+        assert not results[2].success
+        assert results[2].error.response.status_code == 500
+        assert client.execute_actions([]) == []
+
+
+def test_execute_actions_concurrency_limit() -> None:
+    """Test bulk actions do not exceed the concurrency limit."""
+    lock = threading.Lock()
+    running = [0, 0]
+
+    def slow_action(rest_client, fibaro_id, action, arguments):
+        with lock:
+            running[0] += 1
+            running[1] = max(running[0], running[1])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+        return fibaro_id
+
+    with patch.object(DeviceModel, "execute_device_action", side_effect=slow_action):
+        client = FibaroClient(TEST_BASE_URL, max_concurrent_actions=3)
+        results = client.execute_actions(
+            [(fibaro_id, "turnOff", None) for fibaro_id in range(12)]
+        )
+
+    assert [result.result for result in results] == list(range(12))
+    assert 1 < running[1] <= 3
+
+
+def test_execute_group_action_hc3() -> None:
+    """Test group action is sent as one request on HC3."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}loginStatus", json=login_payload)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}settings/info",
+            json={**info_payload, "serialNumber": "HC3-111111"})
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/groupAction/setValue", json={})
+
+        client = FibaroClient(TEST_BASE_URL)
+        client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+
+        device = DeviceModel({"id": 5, "name": "Lamp"}, client._rest_client, 5)
+        results = client.execute_group_action(
+            "setValue", [device, 6], [0], filters={"roomID": [219]}
+        )
+
+        assert [result.fibaro_id for result in results] == [5, 6]
+        assert all(result.success for result in results)
+        assert mock.call_count == 3
+        assert mock.last_request.json() == {
+            "filters": [
+                {"filter": "roomID", "value": [219]},
+                {"filter": "deviceID", "value": [5, 6]},
+            ],
+            "args": [0],
+        }
+
+        assert client.execute_group_action("turnOff") == []
+        assert mock.call_count == 3
+
+
+def test_execute_group_action_fallback() -> None:
+    """Test group action falls back to single requests on HC2."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}loginStatus", json=login_payload)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}settings/info", json=info_payload)
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/5/action/turnOff", json={})
+        mock.register_uri(
+            "POST", f"{TEST_BASE_URL}devices/6/action/turnOff", json={})
+
+        client = FibaroClient(TEST_BASE_URL)
+        client.connect_with_credentials(TEST_USERNAME, TEST_PASSWORD)
+
+        results = client.execute_group_action("turnOff", [5, 6])
+
+        assert [result.fibaro_id for result in results] == [5, 6]
+        assert all(result.success for result in results)
+        assert mock.call_count == 4
+
+        with pytest.raises(NotImplementedError):
+            client.execute_group_action("turnOff", filters={"roomID": [219]})
+
+
+def test_read_device() -> None:
+    """Test reading a single device."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices/5", json={"id": 5, "name": "Lamp"})
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices/6", status_code=404)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices/7", status_code=500)
+
+        client = FibaroClient(TEST_BASE_URL)
+
+        assert client.read_device(5).name == "Lamp"
+        assert client.read_device(6) is None
+        with pytest.raises(HTTPError):
+            client.read_device(7)
+
+
+def test_read_state_cursor() -> None:
+    """Test reading the current refreshStates cursor."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}refreshStates?last=0", json={"last": 4711})
+
+        client = FibaroClient(TEST_BASE_URL)
+
+        assert client.read_state_cursor() == 4711
+        assert mock.last_request.timeout == STATE_CURSOR_TIMEOUT
+
+
+def test_load_all() -> None:
+    """Test reading all startup endpoints at once."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}loginStatus", json=login_payload)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}settings/info", json=info_payload)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}rooms", json=load_fixture("room.json"))
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}scenes", json=load_fixture("scene.json"))
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices", json=load_fixture("device.json"))
+
+        client = FibaroClient(TEST_BASE_URL)
+        hub_data = client.load_all()
+
+        assert hub_data.login.is_logged_in is True
+        assert hub_data.info.serial_number == info_payload["serialNumber"]
+        assert len(hub_data.rooms) == len(load_fixture("room.json"))
+        assert len(hub_data.scenes) == 2
+        assert len(hub_data.devices) > 0
+        assert set(hub_data.timings) == {"login", "info", "rooms", "scenes", "devices"}
+        assert mock.call_count == 5
+
+
+def test_load_all_invalid_authentication() -> None:
+    """Test load all with invalid credentials."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        for endpoint in ["loginStatus", "settings/info", "rooms", "scenes", "devices"]:
+            mock.register_uri("GET", f"{TEST_BASE_URL}{endpoint}", status_code=403)
+
+        client = FibaroClient(TEST_BASE_URL)
+
+        with pytest.raises(HTTPError):
+            client.load_all()
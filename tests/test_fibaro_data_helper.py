@@ -3,6 +3,7 @@
 from unittest.mock import Mock
 
 from pyfibaro.fibaro_data_helper import (
+    devices_by_interface,
     read_devices,
     read_rooms,
     find_master_devices,
@@ -95,3 +96,21 @@ def test_read_devices() -> None:
     devices = read_devices(client, True)
 
     assert len(devices) == 2
+
+
+def test_devices_by_interface() -> None:
+    """Test interface index"""
+    devices = [
+        DeviceModel(data, Mock(), 5) for data in device_payload if "id" in data
+    ]
+
+    interface_index = devices_by_interface(devices)
+
+    for interface_name, indexed_devices in interface_index.items():
+        assert indexed_devices == [
+            device for device in devices if device.has_interface(interface_name)
+        ]
+    assert all(
+        isinstance(device.interfaces, frozenset) for device in devices
+    )
+    assert devices[0].interfaces is DeviceModel(devices[0].raw_data, None, 5).interfaces
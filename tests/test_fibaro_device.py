@@ -295,3 +295,100 @@ def test_fibaro_device_action_with_param() -> None:
         assert mock.call_count == 3
         devices[2].execute_action("abortUpdate", [True])
         assert mock.call_count == 4
+
+
+def test_fibaro_device_updated() -> None:
+    """Test decoded fields of an updated device copy."""
+    device = DeviceModel(
+        {"id": 5, "name": "Sensor", "roomID": 3, "properties": {"batteryLevel": 255}},
+        None,
+        5,
+    )
+    assert device.battery_level == 0
+    assert device.changed_properties == frozenset()
+    assert not hasattr(device, "__dict__")
+
+    updated_device = device.updated({"batteryLevel": 80})
+
+    assert updated_device.battery_level == 80
+    assert updated_device.room_id == 3
+    assert updated_device.changed_properties == {"batteryLevel"}
+    assert device.battery_level == 0
+
+
+def test_fibaro_device_parse_cache() -> None:
+    """Test parsed properties are cached until the property changes."""
+    device = DeviceModel(
+        {
+            "id": 5,
+            "name": "Dimmer",
+            "properties": {
+                "color": "1,2,3,4",
+                "supportedModes": "0,1",
+                "centralSceneSupport": '[{"keyId": 1, "keyAttributes": ["Pressed"]}]',
+            },
+        },
+        None,
+        5,
+    )
+
+    assert device.color.has_color is True
+    assert device.color.rgbw_color == (1, 2, 3, 4)
+    assert device.supported_modes == [0, 1]
+    device.supported_modes.append(2)
+    assert device.supported_modes == [0, 1]
+    assert device.central_scene_event[0].key_id == 1
+    assert device._cache.keys() == {"color", "supportedModes", "centralSceneSupport"}
+
+    updated_device = device.updated({"color": "5,6,7,8"})
+
+    assert updated_device._cache.keys() == {"supportedModes", "centralSceneSupport"}
+    assert updated_device.color.rgbw_color == (5, 6, 7, 8)
+    assert device.color.rgbw_color == (1, 2, 3, 4)
+
+    invalid_device = device.updated({"color": "1,2"})
+    assert invalid_device.color.has_color is False
+    with pytest.raises(TypeError) as first_error:
+        invalid_device.color.rgbw_color
+    with pytest.raises(TypeError) as second_error:
+        invalid_device.color.rgbw_color
+    # the cached error is raised again with the traceback of the parser
+    assert second_error.value is first_error.value
+    assert any(
+        entry.name == "_parse_rgbw" for entry in second_error.traceback
+    )
+
+    broken_device = device.updated({"color": "1,x,3,4"})
+    with pytest.raises(ValueError):
+        broken_device.color.rgbw_color
+
+
+@pytest.mark.parametrize("battery_level", ["", "85.0", None])
+def test_fibaro_device_malformed_values(battery_level: Any) -> None:
+    """Test one malformed device does not break reading all devices."""
+    malformed_device = {
+        "id": 10,
+        "name": "Broken sensor",
+        "parentId": 1,
+        "roomID": None,
+        "properties": {"batteryLevel": battery_level},
+    }
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices", json=[*device_payload, malformed_device]
+        )
+        mock.register_uri("GET", f"{TEST_BASE_URL}loginStatus", json=login_payload)
+        mock.register_uri("GET", f"{TEST_BASE_URL}settings/info", json=info_payload)
+
+        client = FibaroClient(TEST_BASE_URL)
+        client.set_authentication(TEST_USERNAME, TEST_PASSWORD)
+        client.connect()
+
+        devices = client.read_devices()
+
+        assert len(devices) == 4
+        assert devices[3].battery_level == 0
+        assert devices[3].room_id == 0
+        assert devices[3].parent_fibaro_id == 1
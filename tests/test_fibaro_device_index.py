@@ -0,0 +1,81 @@
+"""Test DeviceIndex and the device queries of the snapshot."""
+
+from unittest.mock import Mock
+
+from pyfibaro.fibaro_device import DeviceModel
+from pyfibaro.fibaro_device_index import DEVICE_TYPE, INTERFACE, ROOM_ID, DeviceIndex
+from pyfibaro.fibaro_device_query import DeviceQuery
+from pyfibaro.fibaro_device_snapshot import FibaroDeviceSnapshot
+
+
+def _device(fibaro_id: int, room_id: int, interfaces: list[str]) -> DeviceModel:
+    return DeviceModel(
+        {
+            "id": fibaro_id,
+            "name": f"Device {fibaro_id}",
+            "roomID": room_id,
+            "type": "com.fibaro.binarySwitch",
+            "interfaces": interfaces,
+            "visible": fibaro_id != 3,
+        },
+        Mock(),
+        5,
+    )
+
+
+def test_device_index_build() -> None:
+    """Test building the index."""
+    index = DeviceIndex.build(
+        [_device(1, 5, ["light"]), _device(2, 6, ["light"]), _device(3, 5, [])]
+    )
+
+    assert index.ids(ROOM_ID, 5) == {1, 3}
+    assert index.ids(INTERFACE, "light") == {1, 2}
+    assert index.ids(DEVICE_TYPE, "com.fibaro.binarySwitch") == {1, 2, 3}
+    assert index.ids(ROOM_ID, 99) == frozenset()
+    assert sorted(index.keys(ROOM_ID)) == [5, 6]
+    assert index.find(DeviceQuery(room_id=5, interface="light")) == {1}
+    assert index.find(DeviceQuery(enabled=True)) is None
+
+
+def test_device_index_updated() -> None:
+    """Test updating the index does not modify the old index."""
+    old_device = _device(1, 5, ["light"])
+    index = DeviceIndex.build([old_device, _device(2, 6, ["light"])])
+
+    moved_device = _device(1, 6, ["light"])
+    new_device = _device(4, 7, ["zwave"])
+    updated_index = index.updated([old_device], [moved_device, new_device])
+
+    assert updated_index.ids(ROOM_ID, 6) == {1, 2}
+    assert sorted(updated_index.keys(ROOM_ID)) == [6, 7]
+    assert updated_index.ids(INTERFACE, "zwave") == {4}
+    # unchanged entries are shared with the old index
+    assert updated_index.ids(INTERFACE, "light") is index.ids(INTERFACE, "light")
+    assert index.ids(ROOM_ID, 5) == {1}
+
+
+def test_snapshot_find() -> None:
+    """Test finding devices in a snapshot."""
+    devices = [_device(1, 5, ["light"]), _device(2, 6, ["light"]), _device(3, 5, [])]
+    snapshot = FibaroDeviceSnapshot(1, {device.fibaro_id: device for device in devices})
+
+    assert snapshot.find(DeviceQuery(room_id=5)) == [devices[0], devices[2]]
+    assert snapshot.find(DeviceQuery(room_id=5, visible=True)) == [devices[0]]
+    assert snapshot.find(DeviceQuery(visible=False)) == [devices[2]]
+    assert snapshot.find(DeviceQuery(interface="light")) == devices[:2]
+
+    moved_device = _device(2, 5, ["light"])
+    next_snapshot = snapshot.updated({1: devices[0], 2: moved_device}, [2, 3])
+
+    assert next_snapshot.version == 2
+    assert next_snapshot.find(DeviceQuery(room_id=5)) == [devices[0], moved_device]
+    assert snapshot.find(DeviceQuery(room_id=5)) == [devices[0], devices[2]]
+
+
+def test_snapshot_find_without_index_is_ordered() -> None:
+    """Test queries without indexed criteria are ordered by device id."""
+    devices = [_device(7, 5, []), _device(2, 6, []), _device(4, 5, [])]
+    snapshot = FibaroDeviceSnapshot(1, {device.fibaro_id: device for device in devices})
+
+    assert [device.fibaro_id for device in snapshot.find(DeviceQuery())] == [2, 4, 7]
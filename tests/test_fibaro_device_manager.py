@@ -61,3 +61,23 @@ def test_fibaro_device_manager_add_event_listener() -> None:
     remove = manager.add_event_listener(28, listener.call_method)
 
     remove()
+
+
+def test_fibaro_device_manager_add_property_listener() -> None:
+    """Test manager add property listener."""
+    devices = [
+        DeviceModel(device_payload[2], Mock(), 4),
+        DeviceModel(device_payload[3], Mock(), 4),
+    ]
+
+    listener = Mock()
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    manager = FibaroDeviceManager(fibaro_client)
+    remove = manager.add_property_listener(13, "value", listener.call_method)
+
+    remove()
+
+    manager.close()
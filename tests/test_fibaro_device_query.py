@@ -0,0 +1,58 @@
+"""Test DeviceQuery class."""
+
+import requests_mock
+
+from pyfibaro.fibaro_client import FibaroClient
+from pyfibaro.fibaro_device import DeviceModel
+from pyfibaro.fibaro_device_query import DeviceQuery
+
+from .test_utils import TEST_BASE_URL, load_fixture
+
+device_payload = load_fixture("device.json")
+
+
+def test_device_query_params() -> None:
+    """Test conversion to query parameters."""
+    query = DeviceQuery(room_id=4, interface="light", enabled=True, is_plugin=False)
+
+    assert query.params == {
+        "roomID": "4",
+        "interface": "light",
+        "enabled": "true",
+        "isPlugin": "false",
+    }
+    assert query.endpoint() == (
+        "devices?roomID=4&interface=light&enabled=true&isPlugin=false"
+    )
+    assert DeviceQuery().endpoint() == "devices"
+
+
+def test_read_devices_with_query() -> None:
+    """Test the query is sent to the home center."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}devices", json=device_payload[2:4])
+
+        client = FibaroClient(TEST_BASE_URL)
+        devices = client.read_devices(
+            DeviceQuery(device_type="com.fibaro.binarySwitch", parent_id=3)
+        )
+
+        assert len(devices) == 2
+        assert mock.last_request.qs == {
+            "type": ["com.fibaro.binaryswitch"],
+            "parentid": ["3"],
+        }
+
+
+def test_device_query_matches() -> None:
+    """Test local evaluation of a query."""
+    device = DeviceModel(device_payload[3], None, 4)
+
+    assert DeviceQuery().matches(device)
+    assert DeviceQuery(
+        device_type=device.type, parent_id=device.parent_fibaro_id
+    ).matches(device)
+    assert not DeviceQuery(room_id=device.room_id + 1).matches(device)
+    assert not DeviceQuery(interface="unknown").matches(device)
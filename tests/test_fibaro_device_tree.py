@@ -0,0 +1,127 @@
+"""Test DeviceTree class."""
+
+import random
+from unittest.mock import Mock
+
+from pyfibaro.fibaro_data_helper import find_master_devices
+from pyfibaro.fibaro_device import DeviceModel
+from pyfibaro.fibaro_device_tree import DeviceTree
+
+from .test_utils import load_fixture
+
+device_payload = load_fixture("device-hc3.json")
+device2_payload = load_fixture("device.json")
+device3_payload = load_fixture("device-netatmo-plugin.json")
+
+
+def _device(fibaro_id: int, parent_id: int, device_type: str = "") -> DeviceModel:
+    return DeviceModel(
+        {
+            "id": fibaro_id,
+            "name": f"Device {fibaro_id}",
+            "parentId": parent_id,
+            "type": device_type,
+        },
+        Mock(),
+        5,
+    )
+
+
+def _main_ids(devices: list[DeviceModel]) -> set[int]:
+    return {device.fibaro_id for device in devices}
+
+
+def test_device_tree_main_devices() -> None:
+    """Test main devices are the same as with find_master_devices."""
+    device_lists = [
+        [
+            DeviceModel(device_payload[0], Mock(), 4),
+            DeviceModel(device2_payload[2], Mock(), 4),
+            DeviceModel(device2_payload[3], Mock(), 4),
+            DeviceModel(device_payload[4], Mock(), 4),
+        ],
+        [
+            DeviceModel(device2_payload[2], Mock(), 4),
+            DeviceModel(device2_payload[3], Mock(), 4),
+        ],
+        [DeviceModel(device, Mock(), 4) for device in device3_payload],
+    ]
+
+    for devices in device_lists:
+        tree = DeviceTree(devices)
+        assert _main_ids(tree.main_devices()) == _main_ids(
+            find_master_devices(devices)
+        )
+
+
+def test_device_tree_netatmo() -> None:
+    """Test main device of plugin devices with two child levels."""
+    tree = DeviceTree(DeviceModel(device, Mock(), 4) for device in device3_payload)
+
+    assert tree.main_device_of(267).fibaro_id == 266
+    assert tree.main_device_of(266).fibaro_id == 266
+    assert tree.main_device_of(265) is None
+    assert [device.fibaro_id for device in tree.children_of(265)] == [266, 272]
+    assert tree.parent_of(267).fibaro_id == 266
+    assert tree.children_of(999) == []
+
+
+def test_device_tree_incremental_updates() -> None:
+    """Test the tree matches a full recalculation after each change."""
+    generator = random.Random(4711)
+    devices: dict[int, DeviceModel] = {
+        1: _device(1, 0, "com.fibaro.zwavePrimaryController")
+    }
+    tree = DeviceTree(devices.values())
+
+    for _ in range(300):
+        fibaro_id = generator.randint(2, 30)
+        if fibaro_id in devices and generator.random() < 0.3:
+            del devices[fibaro_id]
+            tree.remove(fibaro_id)
+        else:
+            parent_id = generator.choice([0, 1, *devices])
+            if parent_id == fibaro_id:
+                parent_id = 0
+            devices[fibaro_id] = _device(fibaro_id, parent_id)
+            tree.update(devices[fibaro_id])
+
+        # resolve all devices, so cached results are checked after the next change
+        main_ids = {
+            fibaro_id
+            for fibaro_id in devices
+            if tree.main_device_of(fibaro_id) is devices[fibaro_id]
+        }
+        assert main_ids == _main_ids(find_master_devices(list(devices.values())))
+
+
+def test_device_tree_update_returns_latest_devices() -> None:
+    """Test a device update without new parent returns the new device state."""
+    tree = DeviceTree([_device(5, 0), _device(6, 5)])
+    assert tree.main_device_of(6).fibaro_id == 5
+
+    renamed_device = DeviceModel(
+        {"id": 5, "name": "Renamed", "parentId": 0, "type": ""}, Mock(), 5
+    )
+    tree.update(renamed_device)
+
+    assert tree.main_device_of(6) is renamed_device
+    assert tree.parent_of(6) is renamed_device
+    assert tree.main_devices() == [renamed_device]
+
+
+def test_device_tree_reset_and_apply() -> None:
+    """Test the tree is replaced in place and keeps the snapshot version."""
+    tree = DeviceTree([_device(5, 0), _device(6, 5)])
+
+    tree.apply(3, [_device(7, 5)], [6])
+
+    assert tree.version == 3
+    assert [device.fibaro_id for device in tree.children_of(5)] == [7]
+
+    tree.reset([_device(8, 0)], 4)
+
+    assert tree.version == 4
+    assert len(tree) == 1
+    assert tree.main_device_of(7) is None
+    assert tree.main_device_of(8).fibaro_id == 8
@@ -46,10 +46,12 @@ class TestRefresh:
 
             client.register_update_handler(self.callback_function)
             time.sleep(0.1)
+            assert client.get_dispatch_statistics().dispatched > 0
             client.unregister_update_handler()
 
             assert self.callback_result is not None
             assert mock.call_count > 2
+            assert client.get_dispatch_statistics() is None
 
     def test_fibaro_refresh_fail(self) -> None:
         """Test get request"""
@@ -109,3 +111,25 @@ class TestRefresh:
 
             assert self.callback_result is not None
             assert mock.call_count > 2
+
+    def test_fibaro_refresh_uses_own_session(self) -> None:
+        """Test that stopping the state handler keeps the command session open"""
+        with requests_mock.Mocker() as mock:
+            assert isinstance(mock, requests_mock.Mocker)
+
+            mock.register_uri(
+                "GET", f"{TEST_BASE_URL}refreshStates", json=refresh_payload
+            )
+            mock.register_uri("GET", f"{TEST_BASE_URL}loginStatus", json=login_payload)
+            mock.register_uri("GET", f"{TEST_BASE_URL}settings/info", json=info_payload)
+
+            client = FibaroClient(TEST_BASE_URL)
+            client.set_authentication(TEST_USERNAME, TEST_PASSWORD)
+            client.connect()
+
+            client.register_update_handler(self.callback_function)
+            state_handler = client._state_handler
+            assert state_handler._rest_client is not client._rest_client
+            client.unregister_update_handler()
+
+            assert client.read_info() is not None
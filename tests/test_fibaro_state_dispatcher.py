@@ -0,0 +1,145 @@
+"""Test FibaroStateDispatcher class."""
+
+import threading
+import time
+
+from pyfibaro.fibaro_state_dispatcher import (
+    DispatchOverflowPolicy,
+    FibaroStateDispatcher,
+)
+
+
+class BlockingCallback:
+    """Callback which waits until it is released."""
+
+    def __init__(self) -> None:
+        """Init."""
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.states = []
+
+    def __call__(self, state) -> None:
+        """Record the state after being released."""
+        self.started.set()
+        self.release.wait(2)
+        self.states.append(state)
+
+
+def _wait_until(condition) -> None:
+    end = time.monotonic() + 2
+    while not condition() and time.monotonic() < end:
+        time.sleep(0.005)
+
+
+def _state(last: int) -> dict:
+    return {"last": last, "changes": [{"id": last, "value": last}], "events": []}
+
+
+def test_dispatcher_coalesce() -> None:
+    """Test that a full queue merges new states into the newest queued state."""
+    callback = BlockingCallback()
+    dispatcher = FibaroStateDispatcher(callback, 2, DispatchOverflowPolicy.COALESCE)
+
+    dispatcher.put(_state(1))
+    callback.started.wait(2)
+    for last in range(2, 6):
+        dispatcher.put(_state(last))
+
+    assert dispatcher.statistics.queue_depth == 2
+    assert dispatcher.statistics.coalesced == 2
+
+    callback.release.set()
+    _wait_until(lambda: dispatcher.statistics.dispatched == 3)
+    dispatcher.stop()
+
+    assert [state["last"] for state in callback.states] == [1, 2, 5]
+    assert [change["id"] for change in callback.states[2]["changes"]] == [3, 4, 5]
+    assert dispatcher.statistics.max_queue_depth == 2
+    assert dispatcher.statistics.max_lag > 0
+
+
+def test_dispatcher_drop_oldest() -> None:
+    """Test that a full queue drops the oldest state."""
+    callback = BlockingCallback()
+    dispatcher = FibaroStateDispatcher(callback, 2, DispatchOverflowPolicy.DROP_OLDEST)
+
+    dispatcher.put(_state(1))
+    callback.started.wait(2)
+    for last in range(2, 6):
+        dispatcher.put(_state(last))
+
+    callback.release.set()
+    _wait_until(lambda: dispatcher.statistics.dispatched == 3)
+    dispatcher.stop()
+
+    assert [state["last"] for state in callback.states] == [1, 4, 5]
+    assert dispatcher.statistics.dropped == 2
+
+
+def test_dispatcher_block() -> None:
+    """Test that a full queue blocks until the callback consumed a state."""
+    callback = BlockingCallback()
+    dispatcher = FibaroStateDispatcher(callback, 1, DispatchOverflowPolicy.BLOCK)
+
+    dispatcher.put(_state(1))
+    callback.started.wait(2)
+    dispatcher.put(_state(2))
+
+    producer = threading.Thread(target=dispatcher.put, args=(_state(3),))
+    producer.start()
+    producer.join(0.05)
+    assert producer.is_alive()
+
+    callback.release.set()
+    producer.join(2)
+    _wait_until(lambda: dispatcher.statistics.dispatched == 3)
+    dispatcher.stop()
+
+    assert [state["last"] for state in callback.states] == [1, 2, 3]
+
+
+def test_dispatcher_callback_exception() -> None:
+    """Test that an exception in the callback does not stop dispatching."""
+    states = []
+
+    def callback(state) -> None:
+        states.append(state)
+        raise TypeError()
+
+    dispatcher = FibaroStateDispatcher(callback, 10, DispatchOverflowPolicy.COALESCE)
+    dispatcher.put(_state(1))
+    dispatcher.put(_state(2))
+    _wait_until(lambda: dispatcher.statistics.dispatched == 2)
+    dispatcher.stop()
+
+    assert len(states) == 2
+
+
+def test_dispatcher_stop_waits_for_callback() -> None:
+    """Test that stop returns after the running callback finished."""
+    callback = BlockingCallback()
+    dispatcher = FibaroStateDispatcher(callback, 10, DispatchOverflowPolicy.COALESCE)
+    dispatcher.put(_state(1))
+    assert callback.started.wait(2)
+
+    threading.Timer(0.05, callback.release.set).start()
+    dispatcher.stop()
+
+    assert not dispatcher.is_alive()
+    assert len(callback.states) == 1
+
+
+def test_dispatcher_stop_from_callback() -> None:
+    """Test that the callback can stop its own dispatcher."""
+    stopped = threading.Event()
+
+    def callback(state) -> None:
+        dispatcher.stop()
+        stopped.set()
+
+    dispatcher = FibaroStateDispatcher(callback, 10, DispatchOverflowPolicy.COALESCE)
+    dispatcher.put(_state(1))
+
+    assert stopped.wait(2)
+    dispatcher.join(2)
+    assert not dispatcher.is_alive()
@@ -1,8 +1,18 @@
 """Test FibaroStateMultiplexer class."""
 
+import copy
+import threading
+import time
 from unittest.mock import Mock
+
+from pyfibaro.fibaro_change_filter import NumericChangeFilter
 from pyfibaro.fibaro_device import DeviceModel
-from pyfibaro.fibaro_state_multiplexer import FibaroStateMultiplexer
+from pyfibaro.fibaro_device_query import DeviceQuery
+from pyfibaro.fibaro_state_multiplexer import (
+    DEVICE_MODIFIED,
+    DEVICE_REMOVED,
+    FibaroStateMultiplexer,
+)
 
 from .test_utils import load_fixture
 
@@ -26,6 +36,24 @@ def test_fibaro_state_multiplexer_start() -> None:
     fibaro_client.register_update_handler.assert_called_once()
 
 
+def test_fibaro_state_multiplexer_start_reads_cursor_first() -> None:
+    """Test the cursor is read before the devices and used for polling."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 4711
+    fibaro_client.read_devices.return_value = [
+        DeviceModel(device_payload[2], Mock(), 4)
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+
+    multiplexer.start()
+
+    called = [name for name, _, _ in fibaro_client.mock_calls]
+    assert called.index("read_state_cursor") < called.index("read_devices")
+    fibaro_client.register_update_handler.assert_called_once_with(
+        multiplexer._on_change, last=4711
+    )
+
+
 def test_fibaro_state_multiplexer_stop() -> None:
     """Test state multiplexer stop."""
     fibaro_client = Mock()
@@ -38,13 +66,16 @@ def test_fibaro_state_multiplexer_stop() -> None:
 
 def test_fibaro_state_multiplexer_state_change_listener() -> None:
     """Test state multiplexer add state change listener."""
+    device_data = copy.deepcopy(device_payload[3])
+    device_data["properties"]["value"] = "false"
     devices = [
         DeviceModel(device_payload[2], Mock(), 4),
-        DeviceModel(device_payload[3], Mock(), 4),
+        DeviceModel(device_data, Mock(), 4),
     ]
 
     fibaro_client = Mock()
     fibaro_client.read_devices.return_value = devices
+    fibaro_client.read_state_cursor.return_value = 0
 
     multiplexer = FibaroStateMultiplexer(fibaro_client)
     multiplexer.start()
@@ -56,6 +87,13 @@ def test_fibaro_state_multiplexer_state_change_listener() -> None:
     multiplexer._on_change(refresh_payload)
 
     result_mock.call_method.assert_called_once()
+    device = result_mock.call_method.call_args[0][0]
+    assert device.changed_properties == {"value"}
+
+    # the hub sends the same value again
+    multiplexer._on_change(refresh_payload)
+
+    result_mock.call_method.assert_called_once()
 
 
 def test_fibaro_state_multiplexer_get_devices() -> None:
@@ -107,3 +145,774 @@ def test_fibaro_state_multiplexer_event_listener() -> None:
     multiplexer._on_change(refresh_payload)
 
     result_mock.call_method.assert_called_once()
+
+
+def test_fibaro_state_multiplexer_coalesce_poll() -> None:
+    """Test state multiplexer coalesces changes of one poll."""
+    devices = [
+        DeviceModel(device_payload[2], Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client, coalesce_window=0)
+    multiplexer.start()
+
+    result_mock = Mock()
+    multiplexer.add_change_listener(13, result_mock.call_method)
+
+    multiplexer._on_change(
+        {
+            "changes": [
+                {"id": 13, "value": "10"},
+                {"id": 13, "value": "20"},
+                {"id": 13, "value": "30"},
+            ]
+        }
+    )
+
+    result_mock.call_method.assert_called_once()
+    assert result_mock.call_method.call_args[0][0].properties["value"] == "30"
+
+    multiplexer._on_change({"changes": [{"id": 13, "value": "30"}]})
+
+    result_mock.call_method.assert_called_once()
+
+
+def test_fibaro_state_multiplexer_coalesce_window() -> None:
+    """Test state multiplexer coalesces changes within a time window."""
+    devices = [
+        DeviceModel(device_payload[2], Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client, coalesce_window=0.05)
+    multiplexer.start()
+
+    notified = threading.Event()
+    result_mock = Mock(side_effect=lambda device: notified.set())
+    multiplexer.add_change_listener(13, result_mock)
+
+    multiplexer._on_change({"changes": [{"id": 13, "value": "10"}]})
+    multiplexer._on_change({"changes": [{"id": 13, "value": "20"}]})
+    result_mock.assert_not_called()
+
+    assert notified.wait(2)
+    result_mock.assert_called_once()
+    assert result_mock.call_args[0][0].properties["value"] == "20"
+    multiplexer.stop()
+
+
+def test_fibaro_state_multiplexer_property_listener() -> None:
+    """Test state multiplexer property listeners."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    value_mock = Mock()
+    dead_mock = Mock()
+    wildcard_mock = Mock()
+    multiplexer.add_property_listener(13, "value", value_mock)
+    remove = multiplexer.add_property_listener(13, "dead", dead_mock)
+    multiplexer.add_property_listener(None, "value", wildcard_mock)
+
+    multiplexer._on_change(
+        {"changes": [{"id": 13, "value": "false"}, {"id": 12, "value": "5"}]}
+    )
+
+    value_mock.assert_called_once()
+    dead_mock.assert_not_called()
+    assert [call[0][0].fibaro_id for call in wildcard_mock.call_args_list] == [13, 12]
+
+    remove()
+    multiplexer._on_change({"changes": [{"id": 13, "dead": "true"}]})
+
+    dead_mock.assert_not_called()
+
+
+def test_fibaro_state_multiplexer_batch_listener() -> None:
+    """Test state multiplexer batch listener."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    batch_mock = Mock()
+    remove = multiplexer.add_batch_listener(batch_mock)
+
+    multiplexer._on_change(
+        {
+            "changes": [
+                {"id": 13, "value": "false"},
+                {"id": 13, "dead": "true"},
+                {"id": 12, "value": "5"},
+            ],
+            "events": refresh_payload["events"],
+        }
+    )
+
+    batch_mock.assert_called_once()
+    batch = batch_mock.call_args[0][0]
+    assert [device.fibaro_id for device in batch.devices] == [13, 12]
+    assert batch.changed_properties == {13: {"value", "dead"}, 12: {"value"}}
+    assert len(batch.events) == 2
+
+    # nothing changed
+    multiplexer._on_change({"changes": [{"id": 12, "value": "5"}]})
+    batch_mock.assert_called_once()
+
+    remove()
+    multiplexer._on_change({"changes": [{"id": 12, "value": "6"}]})
+    batch_mock.assert_called_once()
+
+
+def test_fibaro_state_multiplexer_listener_counts() -> None:
+    """Test state multiplexer listener introspection."""
+    fibaro_client = Mock()
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+
+    remove_change = multiplexer.add_change_listener(13, Mock())
+    multiplexer.add_property_listener(13, "value", Mock())
+    multiplexer.add_property_listener(None, "value", Mock())
+    multiplexer.add_event_listener(28, Mock())
+
+    assert multiplexer.get_listener_counts() == {13: 2, 28: 1}
+
+    remove_change()
+
+    assert multiplexer.get_listener_counts() == {13: 1, 28: 1}
+
+
+def test_fibaro_state_multiplexer_snapshot() -> None:
+    """Test state multiplexer publishes immutable snapshots."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    snapshot = multiplexer.get_snapshot()
+    assert len(snapshot) == 2
+
+    multiplexer._on_change({"changes": [{"id": 13, "value": "false"}]})
+
+    new_snapshot = multiplexer.get_snapshot()
+    assert new_snapshot.version == snapshot.version + 1
+    assert new_snapshot.get(13).properties["value"] == "false"
+    assert new_snapshot.get(12) is snapshot.get(12)
+    # the old snapshot and the loaded device are unchanged
+    assert snapshot.get(13).properties["value"] == "true"
+    assert devices[1].properties["value"] == "true"
+
+    # no change, no new snapshot
+    multiplexer._on_change({"changes": [{"id": 13, "value": "false"}]})
+    assert multiplexer.get_snapshot() is new_snapshot
+
+
+def test_fibaro_state_multiplexer_event_type_listener() -> None:
+    """Test state multiplexer event type and wildcard listeners."""
+    fibaro_client = Mock()
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+
+    power_mock = Mock()
+    property_mock = Mock()
+    wildcard_mock = Mock()
+    multiplexer.add_event_type_listener("PowerMetricsChangedEvent", power_mock)
+    remove = multiplexer.add_event_type_listener(
+        "DevicePropertyUpdatedEvent", property_mock
+    )
+    multiplexer.add_event_type_listener(None, wildcard_mock)
+
+    multiplexer._on_change(refresh_payload)
+
+    # hub wide event without device id
+    power_mock.assert_called_once()
+    assert power_mock.call_args[0][0].fibaro_id is None
+    property_mock.assert_called_once()
+    assert wildcard_mock.call_count == 2
+
+    remove()
+    multiplexer._on_change(refresh_payload)
+
+    property_mock.assert_called_once()
+
+
+def test_fibaro_state_multiplexer_device_lifecycle() -> None:
+    """Test state multiplexer handles added, modified and removed devices."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+    new_device = DeviceModel(
+        {"id": 99, "name": "New", "enabled": True, "isPlugin": False}, Mock(), 4
+    )
+    renamed_device = DeviceModel(
+        {**copy.deepcopy(device_payload[3]), "name": "Renamed"}, Mock(), 4
+    )
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+    fibaro_client.read_device.side_effect = lambda fibaro_id: {
+        99: new_device,
+        13: renamed_device,
+    }.get(fibaro_id)
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    added_mock = Mock()
+    removed_mock = Mock()
+    modified_mock = Mock()
+    multiplexer.add_device_added_listener(added_mock)
+    multiplexer.add_device_removed_listener(removed_mock)
+    multiplexer.add_device_modified_listener(modified_mock)
+
+    multiplexer._on_change(
+        {
+            "events": [
+                {"type": "DeviceCreatedEvent", "data": {"id": 99}},
+                {"type": "DeviceModifiedEvent", "data": {"id": 13}},
+                {"type": "DeviceRemovedEvent", "data": {"id": 12}},
+            ]
+        }
+    )
+
+    added_mock.assert_called_once_with(new_device)
+    modified_mock.assert_called_once_with(renamed_device)
+    removed_mock.assert_called_once_with(devices[0])
+    assert {device.fibaro_id for device in multiplexer.get_devices()} == {13, 99}
+    assert multiplexer.get_snapshot().get(13).name == "Renamed"
+    assert fibaro_client.read_device.call_count == 2
+    fibaro_client.read_devices.assert_called_once()
+
+
+def test_fibaro_state_multiplexer_resync_devices() -> None:
+    """Test state multiplexer resyncs single devices."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+    changed_data = copy.deepcopy(device_payload[3])
+    changed_data["properties"]["value"] = "false"
+
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+
+    def read_device(fibaro_id: int) -> DeviceModel | None:
+        assert not multiplexer._update_lock.locked()
+        return {
+            13: DeviceModel(changed_data, Mock(), 4),
+            12: DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        }.get(fibaro_id)
+
+    fibaro_client.read_device.side_effect = read_device
+    multiplexer.start()
+
+    change_mock = Mock()
+    modified_mock = Mock()
+    removed_mock = Mock()
+    multiplexer.add_change_listener(13, change_mock)
+    multiplexer.add_change_listener(12, change_mock)
+    multiplexer.add_device_modified_listener(modified_mock)
+    multiplexer.add_device_removed_listener(removed_mock)
+
+    multiplexer.resync_devices([12, 13, 55])
+
+    change_mock.assert_called_once()
+    assert change_mock.call_args[0][0].changed_properties == {"value"}
+    modified_mock.assert_not_called()
+    removed_mock.assert_not_called()
+    assert multiplexer.get_snapshot().get(13).properties["value"] == "false"
+    assert fibaro_client.read_device.call_count == 3
+
+
+def test_fibaro_state_multiplexer_resume_from_state_store() -> None:
+    """Test state multiplexer restores devices and cursor from the state store."""
+    fibaro_client = Mock()
+    fibaro_client.create_devices.side_effect = lambda raw_data: [
+        DeviceModel(data, Mock(), 4) for data in raw_data
+    ]
+    state_store = Mock()
+    state_store.load.return_value = {
+        "last": 500,
+        "devices": copy.deepcopy(device_payload[2:4]),
+    }
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client, state_store=state_store)
+    multiplexer.start()
+
+    fibaro_client.read_devices.assert_not_called()
+    fibaro_client.register_update_handler.assert_called_once_with(
+        multiplexer._on_change, last=500
+    )
+    assert {device.fibaro_id for device in multiplexer.get_devices()} == {12, 13}
+
+    multiplexer._on_change({"last": 510, "changes": []})
+    multiplexer.stop()
+
+    saved = state_store.save.call_args[0][0]
+    assert saved["last"] == 510
+    assert [data["id"] for data in saved["devices"]] == [12, 13]
+
+
+def test_fibaro_state_multiplexer_cursor_went_back() -> None:
+    """Test state multiplexer reads all devices when the hub cursor is reset."""
+    changed_data = copy.deepcopy(device_payload[3])
+    changed_data["properties"]["value"] = "false"
+
+    fibaro_client = Mock()
+    fibaro_client.create_devices.side_effect = lambda raw_data: [
+        DeviceModel(data, Mock(), 4) for data in raw_data
+    ]
+    fibaro_client.read_devices.return_value = [DeviceModel(changed_data, Mock(), 4)]
+    state_store = Mock()
+    state_store.load.return_value = {
+        "last": 500,
+        "devices": copy.deepcopy(device_payload[2:4]),
+    }
+
+    multiplexer = FibaroStateMultiplexer(fibaro_client, state_store=state_store)
+    multiplexer.start()
+
+    change_mock = Mock()
+    removed_mock = Mock()
+    multiplexer.add_change_listener(13, change_mock)
+    multiplexer.add_device_removed_listener(removed_mock)
+
+    multiplexer._on_change({"last": 600, "changes": []})
+    fibaro_client.read_devices.assert_not_called()
+
+    multiplexer._on_change({"last": 20, "changes": []})
+
+    fibaro_client.read_devices.assert_called_once()
+    change_mock.assert_called_once()
+    assert change_mock.call_args[0][0].changed_properties == {"value"}
+    assert removed_mock.call_args[0][0].fibaro_id == 12
+    assert multiplexer._last == 20
+
+
+def test_fibaro_state_multiplexer_warm_start() -> None:
+    """Test state multiplexer serves saved state and reconciles in background."""
+    changed_data = copy.deepcopy(device_payload[3])
+    changed_data["properties"]["value"] = "false"
+    info = Mock(raw_data={"serialNumber": "HC3-00000001"})
+
+    fibaro_client = Mock()
+    fibaro_client.create_devices.side_effect = lambda raw_data: [
+        DeviceModel(data, Mock(), 5) for data in raw_data
+    ]
+    fibaro_client.create_rooms.return_value = [Mock(raw_data={"id": 1})]
+    fibaro_client.create_scenes.return_value = []
+    fibaro_client.read_info.return_value = info
+    fibaro_client.read_rooms.return_value = [Mock(raw_data={"id": 2})]
+    fibaro_client.read_scenes.return_value = []
+    fibaro_client.read_devices.return_value = [DeviceModel(changed_data, Mock(), 5)]
+    state_store = Mock()
+    state_store.load.return_value = {
+        "last": 500,
+        "info": info.raw_data,
+        "rooms": [{"id": 1}],
+        "scenes": [],
+        "devices": copy.deepcopy(device_payload[2:4]),
+    }
+
+    multiplexer = FibaroStateMultiplexer(
+        fibaro_client, state_store=state_store, warm_start=True
+    )
+    change_mock = Mock()
+    removed_mock = Mock()
+    multiplexer.add_change_listener(13, change_mock)
+    multiplexer.add_change_listener(12, change_mock)
+    multiplexer.add_device_removed_listener(removed_mock)
+
+    multiplexer.start()
+    multiplexer._reconcile_thread.join(timeout=5)
+
+    fibaro_client.restore_info.assert_called_with(info.raw_data)
+    fibaro_client.read_devices.assert_called_once()
+    change_mock.assert_called_once()
+    assert change_mock.call_args[0][0].changed_properties == {"value"}
+    assert removed_mock.call_args[0][0].fibaro_id == 12
+    assert [room.raw_data["id"] for room in multiplexer.get_rooms()] == [2]
+    fibaro_client.read_rooms.assert_called_once()
+
+    saved = state_store.save.call_args[0][0]
+    assert saved["rooms"] == [{"id": 2}]
+    assert [data["id"] for data in saved["devices"]] == [13]
+
+
+def test_fibaro_state_multiplexer_reconcile_keeps_newer_changes() -> None:
+    """Test devices changed by the push channel during a full read are kept."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+    fibaro_client = Mock()
+    fibaro_client.read_devices.return_value = devices
+    fibaro_client.read_state_cursor.return_value = 0
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    def read_outdated_devices(query) -> list[DeviceModel]:
+        multiplexer._on_change(
+            {"changes": [{"id": 13, "value": "false"}], "last": 10}
+        )
+        return [DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4)]
+
+    fibaro_client.read_devices.side_effect = read_outdated_devices
+    multiplexer._resync_all_devices()
+
+    assert multiplexer.get_snapshot().get(13).properties["value"] == "false"
+    assert multiplexer.get_snapshot().get(12) is None
+
+
+def test_fibaro_state_multiplexer_devices_with_interface() -> None:
+    """Test state multiplexer finds devices by interface."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel({"id": 1, "name": "Light", "interfaces": ["light"]}, Mock(), 5),
+        DeviceModel({"id": 2, "name": "Lock", "interfaces": ["zwave"]}, Mock(), 5),
+        DeviceModel(
+            {"id": 3, "name": "Dimmer", "interfaces": ["light", "levelChange"]},
+            Mock(),
+            5,
+        ),
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client, True)
+    multiplexer.start()
+
+    lights = multiplexer.find_devices(DeviceQuery(interface="light"))
+
+    assert [device.fibaro_id for device in lights] == [1, 3]
+    assert multiplexer.find_devices(DeviceQuery(interface="unknown")) == []
+
+
+def test_fibaro_state_multiplexer_find_devices_after_room_change() -> None:
+    """Test the device index follows a device moved to another room."""
+    devices = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+    moved_device = DeviceModel(
+        {**copy.deepcopy(device_payload[3]), "roomID": 777}, Mock(), 4
+    )
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = devices
+    fibaro_client.read_device.return_value = moved_device
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    assert multiplexer.find_devices(DeviceQuery(room_id=777)) == []
+    index = multiplexer.get_snapshot().index
+
+    multiplexer._on_change(
+        {"events": [{"type": "DeviceChangedRoomEvent", "data": {"id": 13}}]}
+    )
+
+    assert multiplexer.find_devices(DeviceQuery(room_id=777)) == [moved_device]
+    assert multiplexer.get_snapshot().index is not index
+    assert multiplexer.get_snapshot().index._buckets["interface"] is (
+        index._buckets["interface"]
+    )
+
+
+def test_fibaro_state_multiplexer_device_tree() -> None:
+    """Test the device tree follows added and removed devices."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel({"id": 5, "name": "Main", "parentId": 0}, Mock(), 5),
+        DeviceModel({"id": 6, "name": "Child", "parentId": 5}, Mock(), 5),
+    ]
+    fibaro_client.read_device.return_value = DeviceModel(
+        {"id": 7, "name": "New", "parentId": 5, "enabled": True, "isPlugin": False},
+        Mock(),
+        5,
+    )
+    multiplexer = FibaroStateMultiplexer(fibaro_client, True)
+    multiplexer.start()
+
+    tree = multiplexer.get_device_tree()
+    assert tree.main_device_of(6).fibaro_id == 5
+
+    multiplexer._on_change(
+        {
+            "events": [
+                {"type": "DeviceCreatedEvent", "data": {"id": 7}},
+                {"type": "DeviceRemovedEvent", "data": {"id": 6}},
+            ]
+        }
+    )
+
+    assert [device.fibaro_id for device in tree.children_of(5)] == [7]
+    assert tree.main_device_of(7).fibaro_id == 5
+    assert tree.get(6) is None
+
+
+def test_fibaro_state_multiplexer_stop_during_reconcile() -> None:
+    """Test a reconcile running at stop publishes and saves nothing."""
+    reading = threading.Event()
+    release = threading.Event()
+
+    def read_devices(query) -> list[DeviceModel]:
+        reading.set()
+        release.wait(5)
+        return [DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 5)]
+
+    fibaro_client = Mock()
+    fibaro_client.create_devices.side_effect = lambda raw_data: [
+        DeviceModel(data, Mock(), 5) for data in raw_data
+    ]
+    fibaro_client.create_rooms.return_value = []
+    fibaro_client.create_scenes.return_value = []
+    fibaro_client.read_info.return_value = Mock(raw_data={})
+    fibaro_client.read_rooms.return_value = []
+    fibaro_client.read_scenes.return_value = []
+    fibaro_client.read_devices.side_effect = read_devices
+    state_store = Mock()
+    state_store.load.return_value = {
+        "last": 500,
+        "info": {},
+        "rooms": [],
+        "scenes": [],
+        "devices": copy.deepcopy(device_payload[2:4]),
+    }
+    multiplexer = FibaroStateMultiplexer(
+        fibaro_client, state_store=state_store, warm_start=True
+    )
+    removed_mock = Mock()
+    multiplexer.add_device_removed_listener(removed_mock)
+    multiplexer.start()
+    reconcile_thread = multiplexer._reconcile_thread
+    assert reading.wait(5)
+
+    threading.Timer(0.1, release.set).start()
+    multiplexer.stop()
+
+    assert not reconcile_thread.is_alive()
+    assert multiplexer.get_devices() == []
+    removed_mock.assert_not_called()
+    state_store.save.assert_called_once()
+    assert [data["id"] for data in state_store.save.call_args[0][0]["devices"]] == [
+        12,
+        13,
+    ]
+
+
+def test_fibaro_state_multiplexer_lifecycle_reads_without_lock() -> None:
+    """Test devices of lifecycle events are read without the update lock."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4)
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    def read_device(fibaro_id: int) -> DeviceModel:
+        assert not multiplexer._update_lock.locked()
+        return DeviceModel(
+            {**copy.deepcopy(device_payload[3]), "name": "Renamed"}, Mock(), 4
+        )
+
+    fibaro_client.read_device.side_effect = read_device
+    multiplexer._on_change(
+        {
+            "events": [
+                {"type": "DeviceModifiedEvent", "data": {"id": 13}},
+                {"type": "DeviceChangedRoomEvent", "data": {"id": 13}},
+            ]
+        }
+    )
+
+    assert multiplexer.get_snapshot().get(13).name == "Renamed"
+    fibaro_client.read_device.assert_called_once_with(13)
+
+
+def test_fibaro_state_multiplexer_device_tree_over_restart() -> None:
+    """Test the device tree stays the same object over stop and start."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel({"id": 5, "name": "Main", "parentId": 0}, Mock(), 5)
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client, True)
+    tree = multiplexer.get_device_tree()
+
+    multiplexer.start()
+    assert tree.get(5) is not None
+    assert tree.version == multiplexer.get_snapshot().version
+
+    multiplexer.stop()
+    assert len(tree) == 0
+
+    multiplexer.start()
+    assert multiplexer.get_device_tree() is tree
+    assert tree.get(5) is not None
+    assert tree.version == multiplexer.get_snapshot().version
+
+
+def test_fibaro_state_multiplexer_change_and_removal_in_one_poll() -> None:
+    """Test a property change and the removal of the same device in one poll."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel(copy.deepcopy(device_payload[2]), Mock(), 4),
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4),
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    change_mock = Mock()
+    removed_mock = Mock()
+    event_mock = Mock()
+    batch_mock = Mock()
+    multiplexer.add_change_listener(13, change_mock)
+    multiplexer.add_device_removed_listener(removed_mock)
+    multiplexer.add_event_type_listener(None, event_mock)
+    multiplexer.add_batch_listener(batch_mock)
+
+    multiplexer._on_change(
+        {
+            "last": 11,
+            "changes": [{"id": 13, "value": "false"}],
+            "events": [{"type": "DeviceRemovedEvent", "data": {"id": 13}}],
+        }
+    )
+
+    change_mock.assert_not_called()
+    assert removed_mock.call_args[0][0].fibaro_id == 13
+    event_mock.assert_called_once()
+    assert batch_mock.call_args[0][0].devices == []
+    assert multiplexer.get_snapshot().get(13) is None
+    assert multiplexer._last == 11
+
+
+def test_fibaro_state_multiplexer_modified_event_reports_differences() -> None:
+    """Test a device read again after a modified event reports its differences."""
+    known_device = DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4)
+    changed_data = copy.deepcopy(device_payload[3])
+    changed_data["properties"]["value"] = "false"
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [known_device]
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    change_mock = Mock()
+    modified_mock = Mock()
+    multiplexer.add_change_listener(13, change_mock)
+    multiplexer.add_device_modified_listener(modified_mock)
+    modified_event = {"events": [{"type": "DeviceModifiedEvent", "data": {"id": 13}}]}
+
+    fibaro_client.read_device.return_value = DeviceModel(
+        copy.deepcopy(device_payload[3]), Mock(), 4
+    )
+    multiplexer._on_change(modified_event)
+
+    change_mock.assert_not_called()
+    modified_mock.assert_not_called()
+    assert multiplexer.get_snapshot().get(13) is known_device
+
+    fibaro_client.read_device.return_value = DeviceModel(changed_data, Mock(), 4)
+    multiplexer._on_change(modified_event)
+
+    change_mock.assert_called_once()
+    assert change_mock.call_args[0][0].changed_properties == {"value"}
+    modified_mock.assert_not_called()
+
+
+def test_fibaro_state_multiplexer_device_tree_follows_snapshot() -> None:
+    """Test the tree gets the final device state of a publish."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel({"id": 5, "name": "Main", "parentId": 0}, Mock(), 5),
+        DeviceModel({"id": 7, "name": "Other", "parentId": 0}, Mock(), 5),
+        DeviceModel({"id": 6, "name": "Child", "parentId": 5}, Mock(), 5),
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client, True)
+    multiplexer.start()
+    tree = multiplexer.get_device_tree()
+    snapshot = multiplexer.get_snapshot()
+
+    child = snapshot.get(6)
+    changed_child = child.updated({"value": 1})
+    moved_child = DeviceModel({"id": 6, "name": "Child", "parentId": 7}, Mock(), 5)
+    with multiplexer._update_lock:
+        multiplexer._publish(
+            snapshot,
+            {**snapshot.devices, 6: moved_child},
+            [changed_child],
+            [(DEVICE_MODIFIED, moved_child)],
+        )
+
+    assert tree.get(6) is moved_child
+    assert tree.parent_of(6).fibaro_id == 7
+    assert tree.children_of(5) == []
+
+    snapshot = multiplexer.get_snapshot()
+    devices = dict(snapshot.devices)
+    del devices[6]
+    with multiplexer._update_lock:
+        multiplexer._publish(
+            snapshot,
+            devices,
+            [moved_child.updated({"value": 2})],
+            [(DEVICE_REMOVED, moved_child)],
+        )
+
+    assert tree.get(6) is None
+    assert tree.version == multiplexer.get_snapshot().version
+
+
+def test_fibaro_state_multiplexer_filtered_listener_removed() -> None:
+    """Test a removed filtered property listener gets no delayed value."""
+    fibaro_client = Mock()
+    fibaro_client.read_state_cursor.return_value = 0
+    fibaro_client.read_devices.return_value = [
+        DeviceModel(copy.deepcopy(device_payload[3]), Mock(), 4)
+    ]
+    multiplexer = FibaroStateMultiplexer(fibaro_client)
+    multiplexer.start()
+
+    listener = Mock()
+    change_filter = NumericChangeFilter(min_interval=0.05)
+    subscription = multiplexer.add_property_listener(
+        13, "value", listener, change_filter
+    )
+    multiplexer._on_change({"changes": [{"id": 13, "value": "1"}]})
+    multiplexer._on_change({"changes": [{"id": 13, "value": "2"}]})
+    listener.assert_called_once()
+
+    subscription()
+    time.sleep(0.15)
+
+    listener.assert_called_once()
+    assert change_filter not in multiplexer._change_filters
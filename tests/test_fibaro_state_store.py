@@ -0,0 +1,52 @@
+"""Test FibaroFileStateStore class."""
+
+import json
+
+import pytest
+
+from pyfibaro.fibaro_state_store import (
+    STORE_FORMAT_VERSION,
+    FibaroFileStateStore,
+    FibaroStateStore,
+)
+
+from .test_utils import load_fixture
+
+device_payload = load_fixture("device.json")
+
+
+def test_file_state_store_round_trip(tmp_path) -> None:
+    """Test saved state is loaded again."""
+    store = FibaroFileStateStore(str(tmp_path / "state.json"))
+
+    store.save({"last": 1234, "devices": device_payload[2:4]})
+    data = store.load()
+
+    assert data["last"] == 1234
+    assert data["devices"] == device_payload[2:4]
+    assert data["version"] == STORE_FORMAT_VERSION
+    assert list(tmp_path.iterdir()) == [tmp_path / "state.json"]
+
+
+def test_file_state_store_missing_or_invalid(tmp_path) -> None:
+    """Test missing, broken and outdated files are ignored."""
+    path = tmp_path / "state.json"
+    store = FibaroFileStateStore(str(path))
+    assert store.load() is None
+
+    path.write_text("{broken", encoding="UTF-8")
+    assert store.load() is None
+
+    path.write_text(json.dumps({"version": 0, "last": 1}), encoding="UTF-8")
+    assert store.load() is None
+
+
+def test_incomplete_state_store() -> None:
+    """Test a store without save() cannot be created."""
+
+    class LoadOnlyStore(FibaroStateStore):
+        def load(self):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnlyStore()
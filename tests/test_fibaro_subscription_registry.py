@@ -0,0 +1,72 @@
+"""Test SubscriptionRegistry class."""
+
+from unittest.mock import Mock
+
+from pyfibaro.fibaro_subscription_registry import SubscriptionRegistry
+
+
+def test_same_listener_registered_twice() -> None:
+    """Test that each registration is removed by its own handle."""
+    registry = SubscriptionRegistry()
+    listener = Mock()
+
+    first = registry.add(13, listener)
+    second = registry.add(13, listener)
+    assert registry.count(13) == 2
+
+    first()
+    assert not first.active
+    assert second.active
+    assert registry.get(13) == [listener]
+
+    # removing twice has no effect
+    first.remove()
+    assert registry.count(13) == 1
+
+
+def test_empty_bucket_cleanup() -> None:
+    """Test that keys without listeners are removed."""
+    registry = SubscriptionRegistry()
+
+    subscription = registry.add(13, Mock())
+    registry.add((13, "value"), Mock())
+    registry.add(28, Mock())
+    assert registry.counts() == {13: 1, (13, "value"): 1, 28: 1}
+    assert len(registry) == 3
+
+    subscription()
+
+    assert not registry.has_key(13)
+    assert registry.get(13) == []
+    assert registry.counts() == {(13, "value"): 1, 28: 1}
+
+
+def test_unregister_while_dispatching() -> None:
+    """Test that a listener can unregister itself while being called."""
+    registry = SubscriptionRegistry()
+    other = Mock()
+
+    def listener() -> None:
+        subscription()
+
+    subscription = registry.add(13, listener)
+    registry.add(13, other)
+
+    for registered in registry.get(13):
+        registered()
+
+    other.assert_called_once()
+    assert registry.count(13) == 1
+
+
+def test_on_remove_called_once() -> None:
+    """Test on_remove is called once when the handle unregisters."""
+    registry = SubscriptionRegistry()
+    on_remove = Mock()
+    subscription = registry.add(1, Mock(), on_remove)
+
+    subscription()
+    subscription.remove()
+
+    on_remove.assert_called_once()
+    assert not subscription.active
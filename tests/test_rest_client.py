@@ -46,3 +46,40 @@ def test_post_request() -> None:
 
         assert mock.call_count == 1
         assert response == info_payload
+
+
+def test_pool_size_and_keep_alive() -> None:
+    """Test connection pool configuration."""
+    client = RestClient(TEST_BASE_URL, False, pool_size=25, keep_alive=False)
+
+    adapter = client._session.get_adapter(TEST_BASE_URL)
+    assert adapter._pool_maxsize == 25
+    assert client._session.headers["Connection"] == "close"
+
+
+def test_push_client_has_own_session() -> None:
+    """Test that the push client does not share the command session."""
+    with requests_mock.Mocker() as mock:
+        assert isinstance(mock, requests_mock.Mocker)
+        mock.register_uri(
+            "GET", f"{TEST_BASE_URL}settings/info", json=info_payload)
+        client = RestClient(TEST_BASE_URL, False, TEST_USERNAME, TEST_PASSWORD)
+        push_client = client.create_push_client()
+
+        assert push_client._session is not client._session
+        assert push_client._session.auth == client._session.auth
+        assert push_client._session.get_adapter(TEST_BASE_URL)._pool_maxsize == 1
+
+        push_client.close()
+        assert client.get("settings/info") == info_payload
+
+
+def test_push_client_gets_new_credentials() -> None:
+    """Test that credentials set later are used by the push client as well."""
+    client = RestClient(TEST_BASE_URL, False, TEST_USERNAME, TEST_PASSWORD)
+    push_client = client.create_push_client()
+
+    client.set_auth("other_user", "other_password")
+
+    assert push_client._session.auth == client._session.auth
+    assert push_client._session.auth.username == "other_user"